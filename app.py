@@ -1,9 +1,18 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from pyngrok import ngrok
+from catalog import catalog_version
+from json_provider import FastJSONProvider
+from pagination import paginate, parse_fields, parse_limit, project
+from payload_extractor import PLATFORM_PATHS, PayloadExtractor, rules
+from render import ndjson_chunks
+from shop_index import ShopIndex
+from timing import install_timing, mark
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
+install_timing(app)  # Server-Timing phase breakdown on every response
 
 # SM Mall of Asia Shops Database
 shops = {
@@ -94,6 +103,16 @@ shops = {
     }
 }
 
+# Built once at load time - partial name lookups go through the index
+shop_index = ShopIndex(shops)
+# Pagination cursors name the directory they were issued for
+shops_version = catalog_version(shops)
+
+def page_params():
+    """(cursor, limit, fields) from the query string; ValueError on bad values"""
+    cursor = request.args.get('cursor')
+    return cursor, parse_limit(request.args.get('limit'), cursor), parse_fields(request.args.get('fields'))
+
 @app.route('/', methods=['GET'])
 def home():
     """Welcome endpoint"""
@@ -102,22 +121,38 @@ def home():
         "version": "1.0.0",
         "endpoints": {
             "GET /": "This welcome message",
-            "GET /api/shops": "Get all shops",
+            "GET /api/shops": "Get all shops (?limit=&cursor= to page, ?fields=name,location to trim)",
             "POST /api/search": "Search for a shop (Recommended for chatbots - POST with JSON: {\"name\": \"shop_name\"})",
             "GET /api/shops/search?name=<shop_name>": "Search for a shop by name (GET)",
             "POST /api/shops/search": "Search for a shop by name (POST with JSON body: {\"name\": \"shop_name\"})",
-            "GET /api/shops/category/<category>": "Get shops by category"
+            "GET /api/shops/category/<category>": "Get shops by category",
+            "GET /api/shops/stream?category=<category>": "Export shops as NDJSON, one per line (category optional)"
         },
         "total_shops": len(shops)
     }), 200
 
 @app.route('/api/shops', methods=['GET'])
 def get_all_shops():
-    """Get all shops"""
-    return jsonify({
+    """Get all shops (?limit=&cursor= pages through them, ?fields= picks fields)"""
+    try:
+        cursor, limit, fields = page_params()
+        page, next_cursor = paginate(list(shops.items()), shops_version, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if limit is None and fields is None:
+        return jsonify({
+            "total": len(shops),
+            "shops": shops
+        }), 200
+    
+    response = {
         "total": len(shops),
-        "shops": shops
-    }), 200
+        "shops": {key: project(shop_data, fields) for key, shop_data in page}
+    }
+    if limit is not None:
+        response["next_cursor"] = next_cursor
+    return jsonify(response), 200
 
 def search_shop_by_name(shop_name):
     """Core search logic - used by multiple endpoints"""
@@ -128,11 +163,14 @@ def search_shop_by_name(shop_name):
         }), 400
     
     shop_name = shop_name.lower().strip()
+    mark('extract')
     
     # Direct match
     if shop_name in shops:
         shop = shops[shop_name]
+        mark('search')
         formatted_response = f"🛍️ {shop['name']}\n📍 Location: {shop['location']}\n🏷️ Category: {shop['category']}"
+        mark('render')
         return jsonify({
             "found": True,
             "shop": shop,
@@ -141,17 +179,18 @@ def search_shop_by_name(shop_name):
     
     # Partial match - search in shop names
     matches = []
-    for key, shop_data in shops.items():
-        if shop_name in key or shop_name in shop_data["name"].lower():
-            matches.append({
-                "key": key,
-                **shop_data
-            })
+    for key in shop_index.search(shop_name):
+        matches.append({
+            "key": key,
+            **shops[key]
+        })
+    mark('search')
     
     if matches:
         if len(matches) == 1:
             shop = matches[0]
             formatted_response = f"🛍️ {shop['name']}\n📍 Location: {shop['location']}\n🏷️ Category: {shop['category']}"
+            mark('render')
             return jsonify({
                 "found": True,
                 "shop": shop,
@@ -160,6 +199,7 @@ def search_shop_by_name(shop_name):
         else:
             shops_list = "\n".join([f"• {s['name']}" for s in matches])
             formatted_response = f"🔍 Found {len(matches)} matching shops:\n{shops_list}\n\nPlease be more specific!"
+            mark('render')
             return jsonify({
                 "found": True,
                 "multiple_matches": True,
@@ -169,6 +209,7 @@ def search_shop_by_name(shop_name):
             }), 200
     
     formatted_response = f"❌ No shop found matching '{shop_name}'\n\n💡 Try: uniqlo, h&m, muji, shake shack, etc."
+    mark('render')
     return jsonify({
         "found": False,
         "message": f"No shop found matching '{shop_name}'",
@@ -176,26 +217,32 @@ def search_shop_by_name(shop_name):
         "formatted_response": formatted_response
     }), 404
 
+# Field names chatbot platforms use for the shop name, then Telegram/Messenger
+# nested structures; the matching path is cached per payload shape
+API_SEARCH_TEXT = PayloadExtractor(rules(
+    ('generic', 'name'), ('generic', 'shop_name'), ('generic', 'query'), ('generic', 'text'), ('generic', 'message'),
+    ('generic', 'user_input'), *PLATFORM_PATHS,
+))
+API_SEARCH_ARGS_TEXT = PayloadExtractor(rules(
+    ('generic', 'name'), ('generic', 'shop_name'), ('generic', 'query'), ('generic', 'text'),
+))
+API_NAME_TEXT = PayloadExtractor(rules(('generic', 'name')))
+# ... and as a last resort, the first string anywhere in the payload
+API_WEBHOOK_TEXT = PayloadExtractor(rules(
+    ('generic', 'name'), ('generic', 'shop_name'), ('generic', 'query'), ('generic', 'text'), ('generic', 'message'),
+    ('generic', 'user_input'), ('generic', 'user_message'), *PLATFORM_PATHS, ('generic', '*'),
+))
+
 @app.route('/api/search', methods=['GET', 'POST'])
 def proxy_search():
     """Unified search endpoint for chatbot/Tookooks - accepts both GET and POST"""
-    shop_name = ''
-    
     if request.method == 'POST':
         data = request.get_json() or {}
-        # Try multiple possible field names that chatbot platforms use
-        shop_name = (data.get('name') or 
-                    data.get('shop_name') or 
-                    data.get('query') or 
-                    data.get('text') or 
-                    data.get('message') or 
-                    data.get('user_input') or '')
+        mark('parse')
+        shop_name = API_SEARCH_TEXT.text(data)
     else:
         # GET method - check query parameters
-        shop_name = (request.args.get('name') or 
-                    request.args.get('shop_name') or 
-                    request.args.get('query') or 
-                    request.args.get('text') or '')
+        shop_name = API_SEARCH_ARGS_TEXT.text(request.args.to_dict())
     
     return search_shop_by_name(shop_name)
 
@@ -203,34 +250,9 @@ def proxy_search():
 def webhook():
     """Webhook endpoint that accepts ANY payload and extracts shop name"""
     data = request.get_json() or {}
+    mark('parse')
     
-    # Extract shop name from various possible structures
-    shop_name = ''
-    
-    # Try common chatbot payload structures
-    if isinstance(data, dict):
-        # Try direct fields
-        shop_name = (data.get('name') or 
-                    data.get('shop_name') or 
-                    data.get('query') or 
-                    data.get('text') or 
-                    data.get('message') or 
-                    data.get('user_input') or 
-                    data.get('user_message') or '')
-        
-        # Try nested structures (message.text, etc)
-        if not shop_name and 'message' in data and isinstance(data['message'], dict):
-            shop_name = data['message'].get('text', '')
-    
-    # If still no shop name, try to find it in the entire JSON
-    if not shop_name:
-        # Search through all values in the dict
-        for value in data.values():
-            if isinstance(value, str) and value:
-                shop_name = value
-                break
-    
-    return search_shop_by_name(shop_name)
+    return search_shop_by_name(API_WEBHOOK_TEXT.text(data))
 
 @app.route('/api/shops/search', methods=['GET', 'POST'])
 def search_shop():
@@ -238,7 +260,8 @@ def search_shop():
     # Handle both POST (JSON body) and GET (query params)
     if request.method == 'POST':
         data = request.get_json() or {}
-        shop_name = data.get('name', '')
+        mark('parse')
+        shop_name = API_NAME_TEXT.text(data)
     else:
         shop_name = request.args.get('name', '')
     
@@ -246,28 +269,45 @@ def search_shop():
 
 @app.route('/api/shops/category/<category>', methods=['GET'])
 def get_shops_by_category(category):
-    """Get shops by category"""
+    """Get shops by category (?limit=&cursor= pages through them, ?fields= picks fields)"""
     category = category.lower()
-    matching_shops = []
+    try:
+        cursor, limit, fields = page_params()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    for key, shop_data in shops.items():
-        if category in shop_data["category"].lower():
-            matching_shops.append({
-                "key": key,
-                **shop_data
-            })
+    matches = [(key, shop_data) for key, shop_data in shops.items()
+               if category in shop_data["category"].lower()]
     
-    if matching_shops:
-        return jsonify({
+    if matches:
+        try:
+            page, next_cursor = paginate(matches, shops_version, cursor, limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        matching_shops = [{"key": key, **project(shop_data, fields)} for key, shop_data in page]
+        response = {
             "category": category,
             "count": len(matching_shops),
             "shops": matching_shops
-        }), 200
+        }
+        if limit is not None:
+            response["total"] = len(matches)
+            response["next_cursor"] = next_cursor
+        return jsonify(response), 200
     
     return jsonify({
         "error": f"No shops found in category '{category}'"
     }), 404
 
+@app.route('/api/shops/stream', methods=['GET'])
+def stream_shops():
+    """Stream all shops as NDJSON (optionally only one category)"""
+    category = request.args.get('category', '').lower()
+    matching = ((key, shop_data) for key, shop_data in shops.items()
+                if category in shop_data["category"].lower())
+    return Response(ndjson_chunks(matching, app.json.dumps), mimetype='application/x-ndjson')
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
@@ -293,6 +333,7 @@ if __name__ == '__main__':
     print(f"   POST {public_url}/api/search")
     print(f"   GET  {public_url}/api/shops/search?name=uniqlo")
     print(f"   GET  {public_url}/api/shops/category/restaurant")
+    print(f"   GET  {public_url}/api/shops/stream?category=restaurant")
     print("="*60 + "\n")
     
     # Run Flask app (use_reloader=False to avoid ngrok reconnection)
@@ -0,0 +1,77 @@
+"""
+Requests/sec for the canned-answer endpoints (/traffic, /company, /assistant).
+
+Runs in-process through app.test_client(), so the numbers measure the Flask
+handler cost without any network in the way.
+
+    python benchmarks/bench_content.py
+    python benchmarks/bench_content.py --app old_simple_app:app --seconds 5
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAYLOADS = {
+    '/traffic': [
+        {"query": "parking rates"},
+        {"query": "where can i park"},
+        {"query": "how to get there by mrt"},
+        {"query": "is traffic bad on weekends"},
+        {"category": "walking_directions"},
+        {},
+    ],
+    '/company': [
+        {"query": "history"},
+        {"query": "who is the owner"},
+        {"query": "upcoming concerts"},
+        {"category": "facilities"},
+        {},
+    ],
+    '/assistant': [
+        {"question": "what time do you open"},
+        {"question": "parking rates"},
+        {"question": "where to eat vikings"},
+        {"question": "fireworks schedule"},
+        {"question": "do you allow pets"},
+        {"question": "tell me a joke"},
+        {},
+    ],
+}
+
+
+def load_app(spec):
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'app')
+
+
+def bench(client, path, payloads, seconds):
+    requests_done = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for payload in payloads:
+            client.post(path, json=payload)
+        requests_done += len(payloads)
+    return requests_done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--app', default='simple_app:app', help="module:attribute of the Flask app")
+    parser.add_argument('--seconds', type=float, default=2.0, help="time spent on each endpoint")
+    args = parser.parse_args()
+
+    client = load_app(args.app).test_client()
+
+    print(f"📊 {args.app}")
+    for path, payloads in PAYLOADS.items():
+        print(f"   {path:<12} {bench(client, path, payloads, args.seconds):>9,.0f} req/s")
+
+
+if __name__ == '__main__':
+    main()
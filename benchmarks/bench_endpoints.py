@@ -0,0 +1,268 @@
+"""
+Ops/sec and p50/p99 latency for every chatbot-facing route, with baselines.
+
+Drives simple_app in-process through app.test_client() with a corpus of
+realistic requests per route (exact names, typos, misses, platform webhook
+shapes, menu picks and free-text questions). The response cache is off so
+the handlers themselves are measured (--cache to measure what production
+sees).
+
+    python benchmarks/bench_endpoints.py                    # run and print
+    python benchmarks/bench_endpoints.py --save-baseline    # record benchmarks/baselines.json
+    python benchmarks/bench_endpoints.py --check            # exit 1 if a route lost more than
+                                                            # --threshold of its baseline ops/sec
+    python benchmarks/bench_endpoints.py --scale            # shop routes on 17, 1k, 10k, 100k
+                                                            # synthetic shops (--sizes to pick)
+
+Baselines are machine-specific: record them on the machine that checks them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_content import PAYLOADS as CONTENT_PAYLOADS
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+SCALE_SIZES = (17, 1000, 10000, 100000)
+
+SEARCH_REQUESTS = [
+    ('GET', '/search', {"query_string": {"shop": "uniqlo"}}),
+    ('GET', '/search', {"query_string": {"shop": "Shake Shack"}}),
+    ('POST', '/search', {"json": {"shop": "starbucks"}}),
+    ('POST', '/search', {"json": {"text": "  MUJI "}}),
+    ('POST', '/search', {"json": {"user_input": "uniqlp"}}),
+    ('POST', '/search', {"json": {"message": "shake shak"}}),
+    ('GET', '/search', {"query_string": {"shop": "krispy kreme"}}),
+    ('POST', '/search', {"data": '{"name": "h&m"}', "content_type": "text/plain"}),
+]
+
+WEBHOOK_REQUESTS = [
+    ('POST', '/webhook', {"json": {"shop": "uniqlo"}}),
+    ('POST', '/webhook', {"json": {"text": "jollibee", "user_id": "u-1842", "platform": "todook"}}),
+    ('POST', '/webhook', {"json": {"user_message": "tim ho wan", "session": {"id": "s-77"}}}),
+    ('POST', '/webhook', {"json": {"content": "ramen nagi", "channel": "messenger"}}),
+    ('POST', '/webhook', {"json": {"query": "starbuck"}}),
+    ('POST', '/webhook', {"json": {"message": "nowhere in particular"}}),
+]
+
+QUERY_REQUESTS = [
+    ('GET', '/query', {"query_string": {"type": "shop", "value": "uniqlo"}}),
+    ('POST', '/query', {"json": {"type": "shop", "value": "muji"}}),
+    ('POST', '/query', {"json": {"type": "shop", "value": "shakeshack"}}),
+    ('GET', '/query', {"query_string": {"type": "category", "value": "food"}}),
+    ('POST', '/query', {"json": {"type": "category", "value": "apparel"}}),
+    ('POST', '/query', {"json": {"type": "category"}}),
+    ('GET', '/query', {"query_string": {"type": "popular"}}),
+]
+
+CATEGORY_REQUESTS = [
+    ('GET', '/category', {"query_string": {"name": "food"}}),
+    ('POST', '/category', {"json": {"category": "Apparel"}}),
+    ('POST', '/category', {"json": {"category": "food and dining"}}),
+    ('GET', '/category', {"query_string": {"name": "food", "limit": "5", "fields": "name,location"}}),
+    ('GET', '/category', {"query_string": {"name": "spaceships"}}),
+]
+
+
+def content_requests(path):
+    return [('POST', path, {"json": payload}) for payload in CONTENT_PAYLOADS[path]] + [
+        ('GET', path, {"query_string": payload}) for payload in CONTENT_PAYLOADS[path][:2]]
+
+
+CORPUS = {
+    '/search': SEARCH_REQUESTS,
+    '/webhook': WEBHOOK_REQUESTS,
+    '/query': QUERY_REQUESTS,
+    '/category': CATEGORY_REQUESTS,
+    '/traffic': content_requests('/traffic'),
+    '/company': content_requests('/company'),
+    '/assistant': content_requests('/assistant'),
+}
+
+CATEGORIES = ["Apparel / Fashion", "Food & Dining", "Casual Dining / Burgers", "Café / Bakery", "Electronics / Gadgets",
+              "Home / Lifestyle", "Beauty / Cosmetics", "Sports / Outdoors", "Books / Stationery", "Toys / Hobbies",
+              "Japanese Restaurant", "Department Store", "Services / Banking", "Entertainment / Cinema",
+              "Health / Pharmacy", "Eyewear", "Jewelry / Watches", "Footwear", "Kids / Baby", "Supermarket / Grocery"]
+WORDS = ["golden", "harbor", "lucky", "sunrise", "manila", "bay", "urban", "island", "metro", "pacific", "kusina",
+         "tindahan", "sari", "bayani", "lotus", "jade", "coral", "mango", "coconut", "ube", "adobo", "bistro", "studio",
+         "outlet", "express", "corner", "house", "garden", "market", "central", "north", "south", "prime", "royal"]
+WINGS = ["Main Mall", "North Wing", "South Wing", "Entertainment Mall", "Hypermarket Building", "Bay Area"]
+
+
+def synthetic_shard(size, seed=17):
+    """A mall shard with size generated shops (deterministic for a given size)"""
+    rng = random.Random(seed * 1_000_003 + size)
+    shops = {}
+    while len(shops) < size:
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {len(shops):x}"
+        shops[name.lower()] = {
+            "name": name,
+            "location": f"{rng.choice(WINGS)}, Level {rng.randint(1, 4)} – near {rng.choice(WORDS).title()}",
+            "category": rng.choice(CATEGORIES),
+        }
+    keys = list(shops)
+    return {"name": f"Synthetic Mall ({size:,} shops)", "popular": keys[:5], "search_hints": keys[:5], "shops": shops}
+
+
+def scale_corpus(mall, shard):
+    """Shop-route requests against /malls/<mall>/..., drawn from the shard's own names"""
+    rng = random.Random(len(shard["shops"]))
+    keys = rng.sample(list(shard["shops"]), min(4, len(shard["shops"])))
+    typo = keys[0][:-1]
+    prefix = f'/malls/{mall}'
+    return {
+        '/search': [('GET', f'{prefix}/search', {"query_string": {"shop": key}}) for key in keys] + [
+            ('POST', f'{prefix}/search', {"json": {"text": typo}}),
+            ('GET', f'{prefix}/search', {"query_string": {"shop": "krispy kreme"}})],
+        '/webhook': [('POST', f'{prefix}/webhook', {"json": {"text": key, "platform": "todook"}}) for key in keys] + [
+            ('POST', f'{prefix}/webhook', {"json": {"message": typo}})],
+        '/query': [('POST', f'{prefix}/query', {"json": {"type": "shop", "value": key}}) for key in keys] + [
+            ('GET', f'{prefix}/query', {"query_string": {"type": "category", "value": "japanese"}}),
+            ('GET', f'{prefix}/query', {"query_string": {"type": "popular"}})],
+        '/category': [
+            ('GET', f'{prefix}/category', {"query_string": {"name": "eyewear", "limit": "20"}}),
+            ('GET', f'{prefix}/category', {"query_string": {"name": "japanese"}}),
+            ('POST', f'{prefix}/category', {"json": {"category": "spaceships"}})],
+    }
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def bench(client, requests_, seconds, warmup=0.2):
+    """{ops_per_sec, p50_ms, p99_ms, requests} cycling through requests_ for seconds"""
+    def run(duration):
+        latencies = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            for method, path, kwargs in requests_:
+                start = time.perf_counter()
+                response = client.open(path, method=method, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{method} {path} {kwargs} -> {response.status_code}")
+        return latencies
+
+    run(warmup)
+    latencies = sorted(run(seconds))
+    return {
+        "ops_per_sec": round(len(latencies) / sum(latencies), 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "requests": len(latencies),
+    }
+
+
+def print_row(label, result):
+    print(f"   {label:<12} {result['ops_per_sec']:>10,.0f} ops/s   p50 {result['p50_ms']:>8.3f} ms   "
+          f"p99 {result['p99_ms']:>8.3f} ms")
+
+
+def run_endpoints(client, seconds, routes):
+    print("📊 Endpoints (simple_app, in-process)")
+    results = {}
+    for route in routes:
+        results[route] = bench(client, CORPUS[route], seconds)
+        print_row(route, results[route])
+    return results
+
+
+def run_scaling(simple_app, client, seconds, sizes):
+    results = {}
+    for size in sizes:
+        mall = f"synthetic{size}"
+        shard = synthetic_shard(size)
+        with open(os.path.join(os.environ['MALLS_DIR'], f"{mall}.json"), 'w', encoding='utf-8') as f:
+            json.dump(shard, f)
+        start = time.perf_counter()
+        simple_app.MALLS.get(mall)
+        load_seconds = time.perf_counter() - start
+        print(f"📊 {size:,} shops (catalog built in {load_seconds:.2f} s)")
+        results[str(size)] = {"load_seconds": round(load_seconds, 3)}
+        for route, requests_ in scale_corpus(mall, shard).items():
+            results[str(size)][route] = bench(client, requests_, seconds)
+            print_row(route, results[str(size)][route])
+    return results
+
+
+def regressions(results, baseline, threshold, prefix=""):
+    """[(label, baseline ops, current ops)] for routes slower than (1 - threshold) x baseline"""
+    found = []
+    for key, result in results.items():
+        if not isinstance(result, dict) or key not in baseline:
+            continue
+        if "ops_per_sec" not in result:
+            found += regressions(result, baseline[key], threshold, f"{prefix}{key} shops ")
+        elif result["ops_per_sec"] < baseline[key]["ops_per_sec"] * (1 - threshold):
+            found.append((f"{prefix}{key}", baseline[key]["ops_per_sec"], result["ops_per_sec"]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help="time spent on each route")
+    parser.add_argument('--routes', default=",".join(CORPUS), help="comma-separated routes to run")
+    parser.add_argument('--scale', action='store_true', help="run the catalog-size scaling mode instead")
+    parser.add_argument('--sizes', default=",".join(map(str, SCALE_SIZES)), help="shop counts for --scale")
+    parser.add_argument('--cache', action='store_true', help="keep the response cache on")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baselines JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="write these results as the baseline")
+    parser.add_argument('--check', action='store_true', help="exit 1 when a route regressed past --threshold")
+    parser.add_argument('--threshold', type=float, default=0.15, help="allowed ops/sec loss (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    # Quiet, deterministic app: no cache (unless asked), no background threads
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_TTL'] = '0'
+    os.environ['CATALOG_WATCH_SECONDS'] = '0'
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp()
+    os.environ.setdefault('MALL_CACHE_MB', '4096')
+    if args.scale:
+        os.environ['MALLS_DIR'] = tempfile.mkdtemp()
+
+    import simple_app
+    client = simple_app.app.test_client()
+
+    section = "scaling" if args.scale else "endpoints"
+    if args.scale:
+        results = run_scaling(simple_app, client, args.seconds, [int(size) for size in args.sizes.split(',')])
+    else:
+        results = run_endpoints(client, args.seconds, [route.strip() for route in args.routes.split(',')])
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[section] = results
+        baselines["recorded"] = {"at": time.strftime('%Y-%m-%dT%H:%M:%S'), "python": platform.python_version(),
+                                 "machine": platform.machine(), "cache": args.cache}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"💾 Baseline saved to {args.baseline}")
+
+    if args.check:
+        if section not in baselines:
+            print(f"❌ No {section} baseline in {args.baseline} (run with --save-baseline first)")
+            sys.exit(2)
+        slower = regressions(results, baselines[section], args.threshold)
+        for label, before, now in slower:
+            print(f"❌ {label}: {now:,.0f} ops/s vs baseline {before:,.0f} ({(now - before) / before * 100:+.1f}%)")
+        if slower:
+            sys.exit(1)
+        print(f"✅ No route lost more than {args.threshold:.0%} of its baseline ops/sec")
+
+
+if __name__ == '__main__':
+    main()
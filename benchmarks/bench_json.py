@@ -0,0 +1,57 @@
+"""
+Encode time for the /company 'complete' answer (the old get_all_info payload).
+
+Compares Flask's stock provider (stdlib json, ASCII escapes) with
+FastJSONProvider on its stdlib fallback and on orjson, all producing the
+compact body jsonify sends.
+
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --number 50000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from content import COMPANY
+from json_provider import FastJSONProvider, orjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000, help="encodes per encoder")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = COMPANY['complete']
+
+    stock = DefaultJSONProvider(app)
+    fallback = FastJSONProvider(app)
+    fallback.use_orjson = False
+    encoders = {
+        'flask default (stdlib, ascii)': lambda: stock.dumps(payload, separators=(',', ':')).encode(),
+        'FastJSONProvider (stdlib)': lambda: fallback.dumps(payload).encode(),
+    }
+    if orjson is not None:
+        fast = FastJSONProvider(app)
+        encoders['FastJSONProvider (orjson)'] = lambda: fast.dumps(payload).encode()
+    else:
+        print("ℹ️  orjson not installed - pip install orjson to compare it")
+
+    print(f"📊 /company complete payload, {len(encoders['FastJSONProvider (stdlib)']())} bytes, {args.number:,} encodes")
+    baseline = None
+    for name, encode in encoders.items():
+        seconds = min(timeit.repeat(encode, number=args.number, repeat=5))
+        per_call = seconds / args.number * 1e6
+        baseline = baseline or per_call
+        print(f"   {name:<32} {per_call:>7.2f} µs/encode  ({baseline / per_call:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
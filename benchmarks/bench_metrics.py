@@ -0,0 +1,72 @@
+"""
+Per-request cost of the metrics middleware.
+
+Times a trivial WSGI app with and without Metrics around it (pure overhead),
+then /search through the real app with and without it.
+
+    python benchmarks/bench_metrics.py
+    python benchmarks/bench_metrics.py --number 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('METRICS_DIR', tempfile.mkdtemp())
+
+from flask import Flask
+
+from metrics import Metrics
+
+
+def drive(wsgi_app, environ, number):
+    """Seconds per request for number requests, closing each body like a server does"""
+    def start_response(status, headers, exc_info=None):
+        return None
+
+    start = time.perf_counter()
+    for _ in range(number):
+        result = wsgi_app(dict(environ), start_response)
+        for chunk in result:
+            pass
+        if hasattr(result, 'close'):
+            result.close()
+    return (time.perf_counter() - start) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000, help="requests per measurement")
+    args = parser.parse_args()
+
+    def hello(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b"ok"]
+
+    stub = Flask(__name__)
+    stub.add_url_rule('/search', 'search', lambda: "ok")
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/search', 'QUERY_STRING': 'shop=uniqlo'}
+
+    bare = drive(hello, environ, args.number)
+    wrapped = drive(Metrics(hello, stub.url_map, flush_interval=0), environ, args.number)
+    print(f"📊 Metrics middleware, {args.number:,} requests")
+    print(f"   bare WSGI app      {bare * 1e6:>7.2f} µs/request")
+    print(f"   with Metrics       {wrapped * 1e6:>7.2f} µs/request  (+{(wrapped - bare) * 1e6:.2f} µs)")
+
+    from simple_app import METRICS, app
+    from werkzeug.test import EnvironBuilder
+    environ = EnvironBuilder(path='/search', query_string='shop=uniqlo').get_environ()
+    number = max(args.number // 10, 1000)
+    inner = METRICS.app if METRICS else app.wsgi_app
+    without = drive(inner, environ, number)
+    with_metrics = drive(app.wsgi_app, environ, number)
+    print(f"   /search without    {without * 1e6:>7.2f} µs/request")
+    print(f"   /search with       {with_metrics * 1e6:>7.2f} µs/request  "
+          f"({(with_metrics - without) / without * 100:+.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Text extraction time per platform payload for /webhook.
+
+Compares PayloadExtractor.extract (rules narrowed once per top-level key
+set) with the plain ordered rule search it replaces on repeat payloads.
+Exits 1 if the cached path is slower on any payload.
+
+    python benchmarks/bench_payload_extractor.py
+    python benchmarks/bench_payload_extractor.py --number 500000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payload_extractor import WEBHOOK_RULES, PayloadExtractor, _lookup, _text
+
+PAYLOADS = {
+    'todook {"shop"}': {"shop": "uniqlo"},
+    'generic {"text", "platform"}': {"text": "muji", "platform": "loadgen"},
+    'telegram message.text': {"update_id": 1, "message": {"message_id": 9, "chat": {"id": 7}, "text": "Uniqlo"}},
+    'messenger entry.0...text': {"object": "page", "entry": [{"id": "1", "time": 1, "messaging": [
+        {"sender": {"id": "2"}, "recipient": {"id": "1"}, "message": {"mid": "m", "text": "muji"}}]}]},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=200000, help="extractions per payload and method")
+    args = parser.parse_args()
+
+    extractor = PayloadExtractor(WEBHOOK_RULES)
+
+    def uncached(payload):
+        match = extractor._search(payload)
+        return (_text(_lookup(payload, match[0])), match[1]) if match else ('', None)
+
+    print(f"📊 WEBHOOK_RULES ({len(extractor.rules)} rules), {args.number:,} extractions each")
+    slower = []
+    for name, payload in PAYLOADS.items():
+        assert extractor.extract(payload) == uncached(payload)
+        cached = min(timeit.repeat(lambda: extractor.extract(payload), number=args.number, repeat=5))
+        search = min(timeit.repeat(lambda: uncached(payload), number=args.number, repeat=5))
+        cached, search = cached / args.number * 1e6, search / args.number * 1e6
+        print(f"   {name:<30} cached {cached:>6.2f} µs  rule search {search:>6.2f} µs  ({search / cached:.1f}x)")
+        if cached > search:
+            slower.append(name)
+    if slower:
+        print(f"❌ Cached extraction slower for: {', '.join(slower)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
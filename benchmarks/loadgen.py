@@ -0,0 +1,308 @@
+"""
+Closed-loop load generator: simulated chat users until the server saturates.
+
+Every user is a coroutine that sends one request, waits for the answer,
+"thinks" (exponential, mean --think seconds) and goes again. Users pick
+shops Zipf-distributed over the mall's directory (popular shops first), and
+mix /search, /webhook, /traffic and /assistant calls like weekend traffic.
+The user count steps up through --users; each step is measured for
+--duration seconds after --ramp seconds of settling, and reports sustained
+throughput and latency. The knee is the last step before throughput stops
+keeping up with the users added (while p99 climbs).
+
+    python benchmarks/loadgen.py --workers 1,2 --users 10,50,100,200,500,1000,2000
+    python benchmarks/loadgen.py --target http://127.0.0.1:8000 --users 100,1000,3000 --think 2
+
+--workers starts gunicorn locally (simple_app:app) with each worker count in
+turn; --target measures a server that is already running. The generator is
+a single process; on a small machine it competes with the server for CPU,
+so compare worker counts on the same box rather than reading absolutes.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import accumulate
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import read_shard
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACTIONS = {'search': 45, 'webhook': 25, 'traffic': 15, 'assistant': 15}
+TRAFFIC_QUERIES = ["parking rates", "where can i park", "how to get there by mrt", "is traffic bad on weekends",
+                   "bus to moa", "grab pickup point"]
+QUESTIONS = ["what time do you open", "where to eat", "fireworks schedule tonight", "do you allow pets",
+             "where is the nearest atm", "is there a cinema", "parking rates"]
+TYPO_RATE = 0.1
+
+
+def zipf_picker(keys, s=1.1, rng=random):
+    """Function returning a key, the i-th one with weight 1 / (i + 1) ** s"""
+    cum_weights = list(accumulate(1 / (rank + 1) ** s for rank in range(len(keys))))
+    return lambda: rng.choices(keys, cum_weights=cum_weights)[0]
+
+
+def popularity_order(shard):
+    """Shop keys, the mall's popular picks first"""
+    popular = [key for key in shard.get('popular', []) if key in shard['shops']]
+    return popular + [key for key in shard['shops'] if key not in popular]
+
+
+def make_request(rng, pick_shop):
+    """(method, path, body, content_type) for one simulated chat message"""
+    action = rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+    if action == 'traffic':
+        return 'POST', '/traffic', json.dumps({"query": rng.choice(TRAFFIC_QUERIES)}).encode(), 'application/json'
+    if action == 'assistant':
+        return 'GET', f"/assistant?question={quote(rng.choice(QUESTIONS))}", b"", None
+
+    shop = pick_shop()
+    if rng.random() < TYPO_RATE and len(shop) > 3:
+        cut = rng.randrange(len(shop))
+        shop = shop[:cut] + shop[cut + 1:]
+    if action == 'search':
+        return 'GET', f"/search?shop={quote(shop)}", b"", None
+    return 'POST', '/webhook', json.dumps({"text": shop, "platform": "loadgen"}).encode(), 'application/json'
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (no third-party deps)"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b"", content_type=None):
+        for attempt in range(2):
+            reused = self.writer is not None
+            if not reused:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Length: {len(body)}\r\n"
+            if content_type:
+                head += f"Content-Type: {content_type}\r\n"
+            self.writer.write(head.encode('latin-1') + b"\r\n" + body)
+            try:
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+            except ConnectionError:
+                status_line = b""
+            if status_line:
+                return await self._read_response(status_line)
+            self.close()
+            if not reused:
+                break  # a fresh connection that says nothing is a real failure
+        raise ConnectionError(f"{method} {path}: connection closed without a response")
+
+    async def _read_response(self, status_line):
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+
+class Stage:
+    """Completions recorded while one user count is being measured"""
+
+    def __init__(self, users):
+        self.users = users
+        self.latencies = []
+        self.errors = 0
+        self.recording = False
+
+    def summary(self, seconds):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else 0.0
+
+        done = len(latencies) + self.errors
+        return {
+            "users": self.users,
+            "throughput": round(len(latencies) / seconds, 1),
+            "p50_ms": round(percentile(0.50), 2),
+            "p99_ms": round(percentile(0.99), 2),
+            "errors": self.errors,
+            "error_rate": round(self.errors / done, 4) if done else 0.0,
+        }
+
+
+async def user(host, port, pick_shop, think, seed, current, timeout):
+    rng = random.Random(seed)
+    connection = HTTPConnection(host, port)
+    await asyncio.sleep(rng.expovariate(1 / think) if think else 0)  # don't all start at once
+    try:
+        # Stops when current[0] is cleared too: wait_for can swallow a cancellation
+        while current[0] is not None:
+            method, path, body, content_type = make_request(rng, pick_shop)
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(connection.request(method, path, body, content_type), timeout)
+                ok = status < 500
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError, asyncio.IncompleteReadError):
+                connection.close()
+                ok = False
+            stage = current[0]
+            if stage is not None and stage.recording:
+                if ok:
+                    stage.latencies.append(time.perf_counter() - start)
+                else:
+                    stage.errors += 1
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+    finally:
+        connection.close()
+
+
+async def run_stages(target, user_counts, duration, ramp, think, shard, timeout=10.0, seed=1):
+    """[stage summary] for each user count, users added step by step"""
+    url = urlsplit(target)
+    host, port = url.hostname, url.port or 80
+    pick_shop = zipf_picker(popularity_order(shard), rng=random.Random(seed))
+    current = [Stage(0)]
+    tasks = []
+    results = []
+    try:
+        for users in user_counts:
+            current[0] = Stage(users)
+            while len(tasks) < users:
+                tasks.append(asyncio.create_task(
+                    user(host, port, pick_shop, think, seed * 100_003 + len(tasks), current, timeout)))
+            await asyncio.sleep(ramp)
+            current[0].recording = True
+            start = time.perf_counter()
+            await asyncio.sleep(duration)
+            current[0].recording = False
+            results.append(current[0].summary(time.perf_counter() - start))
+            print_row(results[-1])
+    finally:
+        current[0] = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+def print_row(row):
+    print(f"   {row['users']:>6,} users  {row['throughput']:>9,.1f} req/s  p50 {row['p50_ms']:>8.2f} ms  "
+          f"p99 {row['p99_ms']:>9.2f} ms  errors {row['errors']}", flush=True)
+
+
+def find_knee(rows, efficiency=0.5):
+    """
+    Last row before saturation: the first step where throughput grew less
+    than `efficiency` times as fast as the user count (or errors appeared).
+    None if throughput kept scaling through every step.
+    """
+    for previous, row in zip(rows, rows[1:]):
+        user_growth = row["users"] / previous["users"] - 1
+        throughput_growth = row["throughput"] / previous["throughput"] - 1 if previous["throughput"] else 0
+        if user_growth > 0 and (throughput_growth < efficiency * user_growth or row["error_rate"] > 0.01):
+            return previous
+    return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workers, port):
+    env = dict(os.environ, CATALOG_WATCH_SECONDS='0', METRICS_DIR=tempfile.mkdtemp())
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', '--backlog', '4096',
+         'simple_app:app'],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"gunicorn -w {workers} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', help="running server to load (default: start gunicorn per --workers)")
+    parser.add_argument('--workers', default='1', help="gunicorn worker counts to compare, e.g. 1,2,4")
+    parser.add_argument('--users', default='10,50,100,200,500,1000,2000', help="simulated users per step")
+    parser.add_argument('--duration', type=float, default=10.0, help="measured seconds per step")
+    parser.add_argument('--ramp', type=float, default=3.0, help="settling seconds before each measurement")
+    parser.add_argument('--think', type=float, default=1.0, help="mean think time between a user's messages")
+    parser.add_argument('--timeout', type=float, default=10.0, help="seconds before a request counts as an error")
+    parser.add_argument('--mall', default=os.path.join(APP_DIR, 'malls', 'moa.json'), help="shard to draw shops from")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    shard = read_shard(args.mall)
+    user_counts = [int(users) for users in args.users.split(',')]
+    runs = [(None, args.target)] if args.target else [(int(workers), None) for workers in args.workers.split(',')]
+
+    report = []
+    for workers, target in runs:
+        server = None
+        if target is None:
+            port = free_port()
+            server = start_gunicorn(workers, port)
+            target = f"http://127.0.0.1:{port}"
+        print(f"🚦 {target}{f' (gunicorn -w {workers})' if workers else ''}, think {args.think}s, "
+              f"{len(shard['shops'])} shops")
+        try:
+            rows = asyncio.run(run_stages(target, user_counts, args.duration, args.ramp, args.think, shard,
+                                          args.timeout))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        knee = find_knee(rows)
+        if knee:
+            print(f"📈 Knee at ~{knee['users']:,} users: {knee['throughput']:,.1f} req/s, p99 {knee['p99_ms']:.1f} ms")
+        else:
+            print("📈 No knee: throughput kept up with every step (add more users)")
+        report.append({"workers": workers, "target": target, "steps": rows, "knee": knee})
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Replay captured traffic (see capture.py) against a server.
+
+Requests go out on the captured schedule at --speed times real time (1 =
+as recorded, 10 = ten times faster, max = back to back), through
+--concurrency connections. The dispatcher never waits for the connections
+(open loop): requests due while all of them are busy queue up, and their
+latency is measured from when they were due, not from when a connection
+got to them - so a server that falls behind shows up as latency instead of
+as a gentler replay. At max speed latency is measured from the send.
+
+    CAPTURE_FILE=captures/traffic.jsonl gunicorn simple_app:app     # record
+    python benchmarks/replay.py captures/traffic.jsonl --target http://127.0.0.1:8000 --speed 10 --concurrency 8
+
+Reports throughput, error rate (5xx and connection failures; 4xx are
+answers, counted separately) and latency percentiles, overall and per path.
+"""
+
+import argparse
+import base64
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import read_capture
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def prepare(entry):
+    """(method, path, query, body bytes, headers) for a capture record"""
+    if 'body_b64' in entry:
+        body = base64.b64decode(entry['body_b64'])
+    else:
+        body = entry.get('body', '').encode('utf-8')
+    headers = {"Content-Type": entry['content_type']} if entry.get('content_type') else {}
+    return entry['method'], entry['path'], entry.get('query', ''), body, headers
+
+
+def replay(records, target, speed=1.0, concurrency=4, timeout=10.0):
+    """
+    Send records to target; speed is a multiplier on the captured gaps (None
+    for back to back). Returns a list of (path, status, seconds, late_seconds)
+    with status None for requests that failed to connect or timed out;
+    seconds run from the scheduled send time, late_seconds is the part spent
+    waiting for a free connection.
+    """
+    target = target.rstrip('/')
+    # Unbounded when replaying on a schedule, so a slow server can't slow the dispatcher down
+    work = queue.Queue(maxsize=0 if speed else concurrency * 4)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            item = work.get()
+            if item is None:
+                return
+            due, (method, path, query, body, headers) = item
+            late = max(0.0, time.perf_counter() - due) if due else 0.0
+            url = f"{target}{path}?{query}" if query else f"{target}{path}"
+            start = time.perf_counter()
+            try:
+                status = session.request(method, url, data=body or None, headers=headers, timeout=timeout).status_code
+            except requests.RequestException:
+                status = None
+            elapsed = time.perf_counter() - (due or start)
+            with lock:
+                results.append((path, status, elapsed, late))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    first_ts = records[0].get('ts', 0) if records else 0
+    start = time.perf_counter()
+    for entry in records:
+        due = None
+        if speed:
+            due = start + (entry.get('ts', first_ts) - first_ts) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        work.put((due, prepare(entry)))
+    for _ in threads:
+        work.put(None)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(results, seconds):
+    """Overall and per-path numbers for a replay that took seconds"""
+    def numbers(rows):
+        latencies = sorted(elapsed for path, status, elapsed, late in rows)
+        errors = sum(1 for path, status, elapsed, late in rows if status is None or status >= 500)
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+            "client_errors": sum(1 for path, status, elapsed, late in rows if status and 400 <= status < 500),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p90_ms": round(percentile(latencies, 0.90) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+        }
+
+    by_path = defaultdict(list)
+    for row in results:
+        by_path[row[0]].append(row)
+    summary = numbers(results)
+    summary["seconds"] = round(seconds, 3)
+    summary["throughput"] = round(len(results) / seconds, 1) if seconds else 0.0
+    summary["max_late_ms"] = round(max((row[3] for row in results), default=0.0) * 1000, 3)
+    summary["paths"] = {path: numbers(rows) for path, rows in sorted(by_path.items())}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help="JSONL file written with CAPTURE_FILE")
+    parser.add_argument('--target', default='http://127.0.0.1:5000', help="server to replay against")
+    parser.add_argument('--speed', default='1', help="1, 10, ... times real time, or max")
+    parser.add_argument('--concurrency', type=int, default=4, help="parallel connections")
+    parser.add_argument('--limit', type=int, help="replay only the first N requests")
+    parser.add_argument('--repeat', type=int, default=1, help="replay the log N times back to back")
+    parser.add_argument('--timeout', type=float, default=10.0, help="per-request timeout in seconds")
+    args = parser.parse_args()
+
+    records = read_capture(args.capture)[:args.limit]
+    truncated = [entry for entry in records if entry.get('body_truncated')]
+    if truncated:
+        # Sending these without their body would replay different requests
+        print(f"⚠️  Skipping {len(truncated):,} requests whose body wasn't captured")
+        records = [entry for entry in records if not entry.get('body_truncated')]
+    if not records:
+        parser.error(f"no requests in {args.capture}")
+    speed = None if args.speed == 'max' else float(args.speed)
+    if args.repeat > 1:
+        span = records[-1].get('ts', 0) - records[0].get('ts', 0) + 1
+        records = [dict(entry, ts=entry.get('ts', 0) + round_ * span)
+                   for round_ in range(args.repeat) for entry in records]
+
+    print(f"🔁 Replaying {len(records):,} requests against {args.target} "
+          f"(speed {args.speed}{'x' if speed else ''}, concurrency {args.concurrency})")
+    start = time.perf_counter()
+    results = replay(records, args.target, speed, args.concurrency, args.timeout)
+    summary = summarize(results, time.perf_counter() - start)
+
+    print(f"   {summary['requests']:,} requests in {summary['seconds']:.2f} s -> {summary['throughput']:,.1f} req/s")
+    print(f"   errors {summary['errors']} ({summary['error_rate']:.2%}), 4xx {summary['client_errors']}, "
+          f"most behind schedule {summary['max_late_ms']:.1f} ms")
+    print(f"   latency p50 {summary['p50_ms']:.2f} ms  p90 {summary['p90_ms']:.2f} ms  "
+          f"p99 {summary['p99_ms']:.2f} ms  max {summary['max_ms']:.2f} ms")
+    for path, numbers in summary['paths'].items():
+        print(f"   {path:<28} {numbers['requests']:>6,}  p50 {numbers['p50_ms']:>7.2f} ms  "
+              f"p99 {numbers['p99_ms']:>7.2f} ms  errors {numbers['errors']}")
+    sys.exit(1 if summary['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
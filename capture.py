@@ -0,0 +1,108 @@
+"""
+Traffic capture: every incoming request appended to a JSONL file.
+
+Off unless CAPTURE_FILE is set. Each line holds what benchmarks/replay.py
+needs to send the request again:
+
+    {"ts": 1760772012.481, "method": "POST", "path": "/webhook", "query": "",
+     "content_type": "application/json", "body": "{\"text\": \"uniqlo\"}"}
+
+Bodies that aren't UTF-8 are stored base64-encoded ("body_b64"); bodies over
+MAX_BODY_BYTES, and chunked bodies the server doesn't terminate
+(wsgi.input_terminated), aren't stored at all ("body_truncated": true) and
+are skipped by replay. Admin routes
+(/metrics, /debug/...) and headers are left out, so secrets never end up in
+the file. Every worker appends to the same file with one write() per line
+(O_APPEND), so lines from different workers don't interleave.
+"""
+
+import base64
+import json
+import os
+import time
+from io import BytesIO
+
+from event_log import log_event
+
+MAX_BODY_BYTES = 64 * 1024
+SKIP_PREFIXES = ('/metrics', '/debug/', '/cache/stats')
+
+
+def record(environ, body):
+    """JSON-able record of one request"""
+    entry = {
+        "ts": round(time.time(), 6),
+        "method": environ.get('REQUEST_METHOD', 'GET'),
+        "path": environ.get('PATH_INFO', '/'),
+        "query": environ.get('QUERY_STRING', ''),
+    }
+    if environ.get('CONTENT_TYPE'):
+        entry["content_type"] = environ['CONTENT_TYPE']
+    if body is None:
+        entry["body_truncated"] = True
+    elif body:
+        try:
+            entry["body"] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode('ascii')
+    return entry
+
+
+class Capture:
+    """WSGI middleware appending each request to a JSONL file"""
+
+    def __init__(self, app, path, skip_prefixes=SKIP_PREFIXES):
+        self.app = app
+        self.path = path
+        self.skip_prefixes = tuple(skip_prefixes)
+        self.captured = 0
+        self._fd = None
+
+    def _write(self, line):
+        if self._fd is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(self._fd, line)
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '/').startswith(self.skip_prefixes):
+            return self.app(environ, start_response)
+
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        body = b""
+        if length:
+            body = environ['wsgi.input'].read(length)
+        elif environ.get('HTTP_TRANSFER_ENCODING'):
+            # Chunked: readable to the end only if the server marks where it ends
+            body = environ['wsgi.input'].read() if environ.get('wsgi.input_terminated') else None
+        if body:
+            # Let the app read the body again
+            environ['wsgi.input'] = BytesIO(body)
+
+        stored = body if body is not None and len(body) <= MAX_BODY_BYTES else None
+        try:
+            self._write(json.dumps(record(environ, stored), ensure_ascii=False).encode('utf-8') + b"\n")
+            self.captured += 1
+        except OSError as e:
+            log_event('capture_failed', path=self.path, error=str(e))
+        return self.app(environ, start_response)
+
+
+def read_capture(path):
+    """Records from a capture file, skipping lines that don't parse (e.g. a torn last line)"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and 'method' in entry and 'path' in entry:
+                records.append(entry)
+    records.sort(key=lambda entry: entry.get('ts', 0))
+    return records
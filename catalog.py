@@ -0,0 +1,112 @@
+"""
+Shop catalog snapshot.
+
+A Catalog bundles one mall's shops with everything derived from them (fuzzy
+index, category index, pre-rendered responses). It is built once and never
+mutated; a changed directory means building a new Catalog with a new version.
+
+Shard files hold one mall each:
+
+    moa.json   {"name": "SM Mall of Asia", "popular": [...], "search_hints": [...],
+                "shops": {key: {"name": ..., "location": ..., "category": ...}}}
+    moa.csv    key,name,location,category rows (mall name = file name)
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+from category_index import CategoryIndex
+from fuzzy_search import FuzzyIndex
+from render import RenderedCatalog
+
+
+def catalog_version(shops, mall_name="", popular=(), search_hints=()):
+    """Short content hash of a mall - changes whenever any shop or setting does"""
+    encoded = json.dumps([mall_name, list(popular), list(search_hints), shops],
+                         sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def read_shard(path):
+    """Shard file (.json or .csv) -> {"name", "popular", "search_hints", "shops"}"""
+    mall_id, ext = os.path.splitext(os.path.basename(path))
+    if ext == '.csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            shops = {row['key']: {"name": row['name'], "location": row['location'], "category": row['category']}
+                     for row in csv.DictReader(f)}
+        return {"name": mall_id, "popular": [], "search_hints": [], "shops": shops}
+
+    with open(path, encoding='utf-8') as f:
+        shard = json.load(f)
+    return {
+        "name": shard.get('name', mall_id),
+        "popular": shard.get('popular', []),
+        "search_hints": shard.get('search_hints', []),
+        "shops": shard['shops'],
+    }
+
+
+class Catalog:
+    """
+    Immutable in-memory snapshot of one mall's shop directory.
+
+    The handlers only use the methods below, which SQLiteCatalog
+    (sqlite_catalog.py) implements too, so either backend can serve them.
+    """
+
+    def __init__(self, shops, dumps, mall_name="SM Mall of Asia", popular=(), search_hints=()):
+        self.shops = shops
+        self.mall_name = mall_name
+        self.popular = tuple(popular)
+        # Keys suggested when a search finds nothing
+        self.search_hints = tuple(search_hints) or self.popular[:5]
+        self.version = catalog_version(shops, mall_name, popular, search_hints)
+        self.fuzzy_index = FuzzyIndex(shops)
+        self.category_index = CategoryIndex(shops)
+        self.rendered = RenderedCatalog(
+            dumps,
+            mall_name,
+            popular=[shops[key] for key in self.popular if key in shops],
+            categories=self.category_index.categories,
+            facets=self.category_index.facets,
+            shops=shops,
+        )
+
+    @classmethod
+    def from_shard(cls, shard, dumps):
+        """Catalog for a read_shard() dict"""
+        return cls(shard['shops'], dumps, mall_name=shard['name'],
+                   popular=shard['popular'], search_hints=shard['search_hints'])
+
+    def __len__(self):
+        return len(self.shops)
+
+    def get(self, shop_key):
+        return self.shops.get(shop_key)
+
+    def find_shop(self, shop_query):
+        """
+        Resolve a shop query to a shop key.
+
+        Exact keys win; otherwise the closest fuzzy match is used.
+        Returns (shop_key or None, list of "did you mean" keys).
+        """
+        if shop_query in self.shops:
+            return shop_query, []
+
+        suggestions = [key for key, distance in self.fuzzy_index.suggest(shop_query)]
+        if suggestions:
+            return suggestions[0], suggestions
+        return None, []
+
+    def category_shops(self, query):
+        """(key, shop) pairs in every AND-ed category term of query, in catalog order"""
+        return [(key, self.shops[key]) for key in self.category_index.shops_for(query)]
+
+    def iter_shops(self, category=None):
+        """(key, shop) pairs in catalog order, only those matching category if given"""
+        if category:
+            return iter(self.category_shops(category))
+        return iter(self.shops.items())
@@ -0,0 +1,87 @@
+"""
+Category index built once when the catalog loads.
+
+A mall has many shops but only a handful of distinct category strings.
+Compound categories ("Food & Dining / Coffee") are split into facets
+("food & dining", "coffee"), and each facet - and each whole category - gets
+a posting list of the shops it matches under the case-insensitive substring
+rule the endpoints always used, built at load. Browsing a facet is a dict
+lookup and costs O(result size); other terms fall back to matching against
+the distinct category strings.
+
+Several terms can be combined with AND ("food and coffee", "food + coffee"),
+which returns the shops matching every term: the shortest posting list is
+walked and checked against the others' sets.
+"""
+
+import re
+
+AND_PATTERN = re.compile(r'\s+and\s+|\s*\+\s*', re.IGNORECASE)
+
+
+def split_facets(category):
+    """'Food & Dining / Coffee' -> ['food & dining', 'coffee']"""
+    return [part.strip().lower() for part in category.split('/') if part.strip()]
+
+
+def split_terms(query):
+    """'Food AND coffee' -> ['food', 'coffee']"""
+    terms = [term.strip().lower() for term in AND_PATTERN.split(query.strip())]
+    return [term for term in terms if term]
+
+
+class CategoryIndex:
+    """Category -> shop keys lookups over a shops dict"""
+
+    def __init__(self, shops):
+        self._keys = list(shops.keys())
+        by_category = {}
+
+        for position, (key, shop_data) in enumerate(shops.items()):
+            category = shop_data['category']
+            by_category.setdefault(category, []).append(position)
+
+        # Sorted display lists, ready for /categories
+        self.categories = sorted(by_category)
+        self.facets = sorted({facet for category in by_category for facet in split_facets(category)})
+        self._by_category = [(category.lower(), tuple(positions))
+                             for category, positions in by_category.items()]
+        # facet or whole category -> (positions in catalog order, the same as a set)
+        self._postings = {}
+        for term in self.facets + [category for category, positions in self._by_category]:
+            if term not in self._postings:
+                positions = self._scan(term)
+                self._postings[term] = (positions, frozenset(positions))
+
+    def _scan(self, term):
+        lists = [positions for category, positions in self._by_category if term in category]
+        if len(lists) == 1:
+            return lists[0]
+        merged = set()
+        for positions in lists:
+            merged.update(positions)
+        return tuple(sorted(merged))
+
+    def _posting(self, term):
+        posting = self._postings.get(term)
+        if posting is None:
+            positions = self._scan(term)
+            posting = (positions, frozenset(positions))
+        return posting
+
+    def shops_for(self, query):
+        """
+        Keys of the shops whose category contains every AND-ed term of query
+        (case-insensitive), in catalog order.
+        """
+        terms = split_terms(query)
+        if not terms:
+            return []
+
+        if len(terms) == 1:
+            return [self._keys[position] for position in self._posting(terms[0])[0]]
+        postings = sorted((self._posting(term) for term in terms), key=lambda posting: len(posting[0]))
+        shortest, others = postings[0][0], [members for positions, members in postings[1:]]
+        positions = [position for position in shortest if all(position in members for members in others)]
+
+        return [self._keys[position] for position in positions]
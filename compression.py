@@ -0,0 +1,91 @@
+"""
+Accept-Encoding negotiation and response compression.
+
+Bodies that only change with the catalog or content version (pre-rendered
+shop, popular, category and canned-answer bodies) are compressed once at the
+highest level and kept in a bounded cache keyed by the body itself, so a new
+catalog version simply produces new keys. Per-request bodies are compressed
+at a cheaper level every time. Bodies below the size threshold are sent as-is;
+the headers would eat most of the saving.
+
+brotli (br) is offered only when the brotli package is installed; gzip is
+always available.
+"""
+
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 500
+COMPRESSIBLE_MIMETYPES = frozenset(['application/json', 'application/x-ndjson', 'text/plain', 'text/html'])
+# Preferred first when the client rates several equally
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# (gzip level, brotli quality) for cached and per-request bodies
+STATIC_LEVELS = (9, 11)
+DYNAMIC_LEVELS = (6, 4)
+
+
+def parse_accept_encoding(header):
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    codings = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def negotiate(header, available=ENCODINGS):
+    """Best available content coding for an Accept-Encoding header, or None for identity"""
+    codings = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, codings.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding, levels=DYNAMIC_LEVELS):
+    if encoding == 'br':
+        return brotli.compress(body, quality=levels[1])
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=levels[0], mtime=0)
+
+
+class CompressionCache:
+    """Compressed variants of long-lived bodies, keyed by (body, encoding)"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def get(self, body, encoding):
+        key = (body, encoding)
+        compressed = self._variants.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding, STATIC_LEVELS)
+            with self._lock:
+                # Oldest first out: bodies of replaced catalog versions age away
+                while len(self._variants) >= self.max_entries:
+                    self._variants.pop(next(iter(self._variants)))
+                self._variants[key] = compressed
+        return compressed
+
+    def __len__(self):
+        return len(self._variants)
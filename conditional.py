@@ -0,0 +1,75 @@
+"""
+Strong ETags and 304 Not Modified for deterministic endpoints.
+
+Some endpoints (/, /categories, /popular, /traffic, /company, ...) return
+the same bytes for the same request until the catalog or content version
+changes. For those, the ETag is a hash of the build, the endpoint, that
+version and the request's inputs (query string and body), so a conditional
+GET is answered before the view runs - nothing is looked up or serialized.
+
+    @app.route('/categories')
+    @conditional(lambda mall=None: get_catalog(mall).version)
+    def get_categories(mall=None): ...
+
+Compressed responses get the encoding appended to their ETag (see
+encoding_etag), since each encoding is its own representation.
+"""
+
+import hashlib
+import os
+from functools import wraps
+
+from flask import Response, make_response, request
+
+# Render sets RENDER_GIT_COMMIT per deploy, so new code never reuses old tags
+BUILD_ID = os.getenv('RENDER_GIT_COMMIT', '')
+CACHE_MAX_AGE = int(os.getenv('CACHE_MAX_AGE', '60'))
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}"
+ENCODING_SUFFIXES = ('', '-gzip', '-br')
+
+
+def request_etag(version):
+    """Strong ETag (unquoted) for the current request against version"""
+    digest = hashlib.sha1(f"{BUILD_ID}\0{request.endpoint}\0{version}\0".encode())
+    digest.update(request.query_string)
+    digest.update(b"\0")
+    digest.update(request.get_data())
+    return digest.hexdigest()[:20]
+
+
+def encoding_etag(response, encoding):
+    """Give a response compressed with encoding its own ETag"""
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+
+
+def conditional(version_for, cache_control=CACHE_CONTROL):
+    """
+    Decorator: tag GET/HEAD responses of a view whose body only depends on
+    version_for(**view_args) and the request, and answer If-None-Match with
+    304 without calling the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(**kwargs)
+
+            etag = request_etag(version_for(**kwargs))
+            if request.if_none_match:
+                for suffix in ENCODING_SUFFIXES:
+                    if request.if_none_match.contains_weak(etag + suffix):
+                        response = Response(status=304)
+                        response.set_etag(etag + suffix)
+                        response.headers['Cache-Control'] = cache_control
+                        response.vary.add('Accept-Encoding')
+                        return response
+
+            response = make_response(view(**kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,719 @@
+"""
+Canned answers for /traffic, /company and /assistant.
+
+All of this text is static, so it lives here instead of inside the request
+handlers. ContentRegistry JSON-encodes every answer once at import and the
+handlers only pick which answer to send.
+"""
+
+import hashlib
+
+TRAFFIC = {
+    "parking_rates": {
+        "found": True,
+        "type": "parking_rates",
+        "message": (
+            "🅿️ *SM MOA Parking Rates:*\n\n"
+            "🕐 *Hourly Rate:* ₱40 per hour\n"
+            "📅 *Daily Max:* ₱200\n"
+            "🌙 *Overnight:* ₱300\n"
+            "⚠️ *Additional:* +₱50 if exiting after 6:01 AM\n\n"
+            "💡 *Tips:*\n"
+            "• Pay at exit lanes or parking payment booths\n"
+            "• Cash and card accepted\n"
+            "• Keep your parking ticket safe!\n"
+            "• Use SM Car Park App to check availability"
+        )
+    },
+    "parking_locations": {
+        "found": True,
+        "type": "parking_locations",
+        "message": (
+            "🅿️ *SM MOA Parking Facilities:*\n\n"
+            "1️⃣ *Main Mall* (~8,000 slots)\n"
+            "   📍 North & South Parking Buildings\n"
+            "   🌙 Overnight parking available\n\n"
+            "2️⃣ *MOA Arena (MAAX)* (1,400 slots)\n"
+            "   📍 Adjacent to the Arena\n"
+            "   🎫 Event parking available\n\n"
+            "3️⃣ *NU Mall of Asia (NUMA)* (720 slots)\n"
+            "   📍 Near the Arena\n"
+            "   🏢 Office & retail parking\n\n"
+            "4️⃣ *IKEA MOA Square* (200 slots)\n"
+            "   � Adjacent to IKEA store\n"
+            "   🛒 Shopping parking\n\n"
+            "5️⃣ *SMX Convention Center* (400 slots)\n"
+            "   📍 Basement parking area\n"
+            "   📊 Convention & event parking\n\n"
+            "� *Use SM Car Park App* to find open slots!"
+        )
+    },
+    "public_transport": {
+        "found": True,
+        "type": "public_transport",
+        "message": (
+            "🚇 *How to Get to SM MOA:*\n\n"
+            "🚆 *MRT/LRT:*\n"
+            "• Take MRT-3 or LRT-1 to *Taft Avenue Station*\n"
+            "• Exit and take a jeepney or UV Express to MOA\n"
+            "• Travel time: ~10-15 minutes\n\n"
+            "🚌 *Bus Routes:*\n"
+            "• EDSA Carousel (free): Monumento to MOA\n"
+            "• Regular buses: Routes via EDSA-Taft\n\n"
+            "🚕 *Taxi/Grab:*\n"
+            "• Available 24/7\n"
+            "• From Taft: ₱80-120\n\n"
+            "🚶 *From Taft Station:*\n"
+            "• Jeepney: ₱15-20\n"
+            "• UV Express: ₱25-30"
+        )
+    },
+    "traffic_tips": {
+        "found": True,
+        "type": "traffic_tips",
+        "message": (
+            "🚦 *SM MOA Traffic Conditions:*\n\n"
+            "📊 *Traffic Severity:*\n"
+            "• Manila ranks among world's most congested cities\n"
+            "• Peak congestion often exceeds 60%\n\n"
+            "⏰ *Worst Traffic Times:*\n"
+            "• Weekends & holidays (all day)\n"
+            "• During MOA Arena or SMX events\n"
+            "• Rush hours: 7-9 AM, 5-8 PM\n\n"
+            "🛣️ *Main Roads:*\n"
+            "• *Macapagal Boulevard* (8-lane road)\n"
+            "• *Jose W. Diokno Boulevard* (4.38 km)\n"
+            "• Both run parallel to MOA complex\n\n"
+            "✅ *Best Times to Visit:*\n"
+            "• Weekdays: 10:00 AM - 4:00 PM\n"
+            "• Early mornings before 10:00 AM\n\n"
+            "📱 *Real-Time Traffic Apps:*\n"
+            "• Waze (live updates & routing)\n"
+            "• Google Maps (traffic conditions)\n"
+            "• SM Car Park App (parking availability)"
+        )
+    },
+    "walking_directions": {
+        "found": True,
+        "type": "walking_directions",
+        "message": (
+            "🚶 *Walking to SM MOA:*\n\n"
+            "📍 *From Nearby Areas:*\n\n"
+            "🏨 *From Conrad/Sheraton Hotels:*\n"
+            "• 5-10 minute walk along Seaside Boulevard\n"
+            "• Air-conditioned skybridge available\n\n"
+            "🏢 *From Bay Area/MOA Arena:*\n"
+            "• 10-15 minute walk to Main Mall\n"
+            "• Follow the baywalk path\n\n"
+            "🚉 *From Nearby Bus Stops:*\n"
+            "• EDSA Carousel stop: 5 min walk\n"
+            "• Regular bus stops: 2-5 min walk\n\n"
+            "💡 Tip: The mall is huge! Use mall directories to find shops."
+        )
+    },
+    "help": {
+        "found": False,
+        "type": "help",
+        "message": (
+            "🤔 I'm not sure about that.\n\n"
+            "I can help you with:\n\n"
+            "🅿️ *Parking*\n"
+            "   • Rates & pricing\n"
+            "   • Parking locations\n\n"
+            "🚇 *Public Transport*\n"
+            "   • MRT/LRT directions\n"
+            "   • Bus routes\n\n"
+            "🚦 *Traffic Info*\n"
+            "   • Peak hours\n"
+            "   • Best times to visit\n\n"
+            "🚶 *Walking Directions*\n"
+            "   • From nearby areas\n\n"
+            "What would you like to know?"
+        )
+    }
+}
+
+COMPANY = {
+    "overview": {
+        "found": True,
+        "type": "overview",
+        "message": (
+            "🏢 *SM Mall of Asia (MOA)*\n\n"
+            "SM Mall of Asia is SM Prime Holdings' flagship integrated retail and entertainment complex "
+            "located on reclaimed land along Manila Bay in Pasay City.\n\n"
+            "📅 *Opened:* May 21, 2006\n"
+            "🏗️ *Developer:* SM Prime Holdings, Inc. (SMPH)\n"
+            "📐 *Estate Size:* ~60 hectares\n"
+            "🏬 *Mall GFA:* 386,224 m²\n"
+            "📍 *Location:* Pasay City, Manila Bay\n\n"
+            "MOA is one of the Philippines' largest retail and entertainment destinations, "
+            "functioning as a mixed-use hub featuring retail, arenas, convention center, offices, hotels, and event grounds."
+        )
+    },
+    "facilities": {
+        "found": True,
+        "type": "facilities",
+        "message": (
+            "🏟️ *MOA Complex Major Facilities:*\n\n"
+            "1️⃣ *MOA Arena*\n"
+            "   • Multipurpose indoor arena\n"
+            "   • Capacity: ~15,000 seated (up to 20,000 for concerts)\n"
+            "   • Hosts concerts, sports, large events\n\n"
+            "2️⃣ *Ice Skating Rink*\n"
+            "   • Olympic-sized rink (~1,800 m²)\n"
+            "   • Opened/relocated in 2017\n"
+            "   • Hosts national/international competitions\n\n"
+            "3️⃣ *SMX Convention Center*\n"
+            "   • Convention & exhibition complex\n"
+            "   • Trade shows, corporate events\n\n"
+            "4️⃣ *MOA Concert Grounds / Event Grounds*\n"
+            "   • Large open grounds for concerts & festivals\n"
+            "   • Serves as parking when no events\n\n"
+            "5️⃣ *IKEA Philippines*\n"
+            "   • ~65,000 m² GFA (announced 2018)\n"
+            "   • Major international anchor tenant"
+        )
+    },
+    "statistics": {
+        "found": True,
+        "type": "statistics",
+        "message": (
+            "📊 *SM Mall of Asia - Key Statistics*\n\n"
+            "📅 *Opening Date:* May 21, 2006\n\n"
+            "📐 *Size & Capacity:*\n"
+            "• Estate Size: ~60 hectares\n"
+            "• Mall GFA: 386,224 m²\n"
+            "• Lot Area: 142,146 m²\n"
+            "• Arena Capacity: 15,000-20,000\n\n"
+            "👥 *Q1 2025 Foot Traffic:*\n"
+            "• 34.5 million visits\n"
+            "• ~15% increase YoY\n"
+            "• Driven by strong event lineup\n\n"
+            "🅿️ *Parking:*\n"
+            "• ~10,720 total parking slots\n"
+            "• Multiple parking buildings\n"
+            "• MAAX Arena parking annex"
+        )
+    },
+    "history": {
+        "found": True,
+        "type": "history",
+        "message": (
+            "📜 *SM Mall of Asia - History & Development*\n\n"
+            "🏗️ *Development Timeline:*\n\n"
+            "📅 *2006* - Grand Opening (May 21)\n"
+            "   • Main mall complex opened\n"
+            "   • Built on reclaimed land along Manila Bay\n\n"
+            "📅 *2012* - MOA Arena Opens\n"
+            "   • 15,000+ capacity indoor arena\n"
+            "   • Major events & concert venue\n\n"
+            "📅 *2017* - Ice Rink Relocated\n"
+            "   • Olympic-sized skating rink\n"
+            "   • Competition-ready facility\n\n"
+            "📅 *2018* - IKEA Announced\n"
+            "   • 65,000 m² flagship store\n"
+            "   • Major international expansion\n\n"
+            "🏢 *Strategic Role:*\n"
+            "SM Prime's flagship integrated estate and strategic "
+            "'experience-led' asset, driving retail, events, and tourism in Metro Manila."
+        )
+    },
+    "ownership": {
+        "found": True,
+        "type": "ownership",
+        "message": (
+            "🏢 *Ownership & Management*\n\n"
+            "👔 *Owner/Developer:*\n"
+            "SM Prime Holdings, Inc. (SMPH)\n\n"
+            "📍 *About SM Prime:*\n"
+            "• One of Southeast Asia's largest integrated property developers\n"
+            "• Publicly listed company\n"
+            "• Portfolio includes malls, residences, hotels, convention centers\n\n"
+            "⭐ *Strategic Position:*\n"
+            "• MOA is SM Prime's flagship integrated estate\n"
+            "• Described as strategic 'experience-led' asset\n"
+            "• Major revenue and foot-traffic driver\n"
+            "• Core property in integrated-estate strategy\n\n"
+            "💼 *Economic Role:*\n"
+            "• Generates retail rental income\n"
+            "• Event/arena revenues\n"
+            "• Supports tourism & entertainment\n"
+            "• Major economic engine for SM Prime"
+        )
+    },
+    "events": {
+        "found": True,
+        "type": "events",
+        "message": (
+            "🎉 *MOA Events & Cultural Role*\n\n"
+            "🎭 *Major Events Hosted:*\n"
+            "• Large concerts & music festivals\n"
+            "• Philippine International Pyromusical Competition\n"
+            "• Sporting events (SEA Games events)\n"
+            "• Trade shows & exhibitions\n"
+            "• Corporate events & conventions\n\n"
+            "🎯 *Event Impact:*\n"
+            "• Primary Manila venue for large concerts\n"
+            "• Major foot traffic driver\n"
+            "• City-level cultural significance\n"
+            "• Events magnet (not just retail destination)\n\n"
+            "📈 *Q1 2025 Performance:*\n"
+            "• 34.5 million visits\n"
+            "• ~15% increase attributed to events\n"
+            "• Strong concert & festival lineup\n\n"
+            "🏟️ *Venues:*\n"
+            "• MOA Arena (15,000-20,000 capacity)\n"
+            "• Concert Grounds / MOA Square\n"
+            "• SMX Convention Center"
+        )
+    },
+    "complete": {
+        "found": True,
+        "type": "complete",
+        "message": (
+            "🏢 *SM MALL OF ASIA - Complete Information*\n\n"
+            "📍 *Location:* Pasay City, Manila Bay\n"
+            "📅 *Opened:* May 21, 2006\n"
+            "🏗️ *Developer:* SM Prime Holdings, Inc.\n\n"
+            "📊 *Size & Capacity:*\n"
+            "• Estate: ~60 hectares\n"
+            "• Mall GFA: 386,224 m²\n"
+            "• Q1 2025: 34.5M visits\n\n"
+            "🏟️ *Major Facilities:*\n"
+            "• MOA Arena (15-20K capacity)\n"
+            "• Olympic Ice Rink\n"
+            "• SMX Convention Center\n"
+            "• Concert Grounds\n"
+            "• IKEA (65,000 m²)\n\n"
+            "🎯 *Strategic Role:*\n"
+            "SM Prime's flagship integrated estate - retail, entertainment, events, tourism hub\n\n"
+            "💡 Ask about: overview, facilities, statistics, history, ownership, or events"
+        )
+    }
+}
+
+ASSISTANT = {
+    "welcome": {
+        "found": False,
+        "type": "help",
+        "message": (
+            "👋 *Welcome to MOA AI Assistant!*\n\n"
+            "I can help you with:\n\n"
+            "🛍️ *Shopping*\n"
+            "• Store locations & hours\n"
+            "• Shop directory\n"
+            "• Price ranges\n\n"
+            "🅿️ *Parking & Transport*\n"
+            "• Parking rates & locations\n"
+            "• Traffic tips\n"
+            "• How to get here\n\n"
+            "🍽️ *Dining*\n"
+            "• Restaurants & cuisine\n"
+            "• Price ranges\n"
+            "• Reservations\n\n"
+            "🏢 *About MOA*\n"
+            "• History & facilities\n"
+            "• Events & arena\n"
+            "• Operating hours\n\n"
+            "Just ask me anything!"
+        )
+    },
+    "hours": {
+        "found": True,
+        "type": "hours",
+        "message": (
+            "🕐 *SM Mall of Asia Operating Hours*\n\n"
+            "📅 *Daily:* 10:00 AM - 10:00 PM\n\n"
+            "⏰ *Extended Hours:*\n"
+            "• Restaurants may open until 11:00 PM\n"
+            "• Arena events: varies by schedule\n"
+            "• 24/7: Security & parking\n\n"
+            "💡 *Special Hours:*\n"
+            "Holidays and special events may have different hours. "
+            "Check our events calendar for updates!"
+        )
+    },
+    "parking_rates": {
+        "found": True,
+        "type": "parking_rates",
+        "message": (
+            "🅿️ *MOA Parking Rates*\n\n"
+            "💵 *Standard Rates:*\n"
+            "• First 3 hours: ₱50\n"
+            "• Succeeding hours: ₱20/hour\n"
+            "• Daily max: ₱200\n"
+            "• Overnight: ₱300\n"
+            "• Additional: +₱50 if exiting after 6:01 AM\n\n"
+            "🚗 *Parking Buildings:*\n"
+            "• North Parking (8,000 slots)\n"
+            "• South Parking\n"
+            "• Seaside Parking\n"
+            "• Arena Parking\n\n"
+            "💡 *Tip:* Arrive early during events!"
+        )
+    },
+    "transport": {
+        "found": True,
+        "type": "transport",
+        "message": (
+            "🚇 *How to Get to SM Mall of Asia*\n\n"
+            "🚆 *By MRT/LRT:*\n"
+            "• Take MRT-3 or LRT-1 to Taft Avenue Station\n"
+            "• Take jeepney/UV Express to MOA (~15 min)\n"
+            "• Fare: ₱15-30\n\n"
+            "🚌 *By Bus:*\n"
+            "• EDSA Carousel (free)\n"
+            "• Regular buses via EDSA-Taft\n\n"
+            "🚕 *By Taxi/Grab:*\n"
+            "• From NAIA: 15-25 minutes\n"
+            "• From Makati: 30-45 minutes\n\n"
+            "📍 *Address:*\n"
+            "Seaside Blvd, Pasay City, Metro Manila"
+        )
+    },
+    "vikings": {
+        "found": True,
+        "type": "restaurant",
+        "message": (
+            "🍽️ *Vikings Luxury Buffet*\n\n"
+            "📍 *Location:* Seaside Boulevard, SM by the Bay\n"
+            "🍴 *Cuisine:* International Buffet\n"
+            "💰 *Price:* ₱1,000 - ₱2,500 per person\n"
+            "⏰ *Hours:*\n"
+            "• Lunch: 11:00 AM - 2:30 PM\n"
+            "• Dinner: 5:30 PM - 10:00 PM\n\n"
+            "📞 *Reservations:* Recommended\n"
+            "Visit Vikings website for bookings!"
+        )
+    },
+    "manam": {
+        "found": True,
+        "type": "restaurant",
+        "message": (
+            "🍽️ *Manam Comfort Filipino*\n\n"
+            "📍 *Location:* Main Mall, South Wing Ground Floor\n"
+            "🍴 *Cuisine:* Filipino Comfort Food\n"
+            "💰 *Price:* ₱350 - ₱700 per person\n"
+            "⏰ *Hours:* 10:00 AM - 10:00 PM\n\n"
+            "🌟 *Popular Dishes:*\n"
+            "• Sinigang na Corned Beef\n"
+            "• Sisig\n"
+            "• Crispy Dinuguan"
+        )
+    },
+    "dining": {
+        "found": True,
+        "type": "dining",
+        "message": (
+            "🍽️ *MOA Dining Options*\n\n"
+            "🌟 *Featured Restaurants:*\n\n"
+            "**Filipino:**\n"
+            "• Manam (₱350-700)\n"
+            "• Jollibee (₱80-200)\n\n"
+            "**International:**\n"
+            "• Vikings Buffet (₱1,000-2,500)\n"
+            "• Italianni's (₱600-1,500)\n\n"
+            "**Casual:**\n"
+            "• Starbucks Reserve (₱150-450)\n"
+            "• Various food courts\n\n"
+            "📍 *Locations:*\n"
+            "• Main Mall: Ground & 2nd Floor\n"
+            "• Entertainment Mall\n"
+            "• Seaside Boulevard\n\n"
+            "Ask me about a specific restaurant!"
+        )
+    },
+    "fireworks": {
+        "found": True,
+        "type": "events",
+        "message": (
+            "🎆 *MOA Fireworks Display*\n\n"
+            "📅 *Schedule:* Every Friday to Sunday\n"
+            "⏰ *Time:* 7:00 PM\n"
+            "📍 *Location:* Manila Bay, Seaside Boulevard\n\n"
+            "🎉 *Philippine International Pyromusical Competition:*\n"
+            "• Annual event (dates vary)\n"
+            "• Multiple countries compete\n"
+            "• Best viewed from Seaside Boulevard\n\n"
+            "💡 *Tip:* Arrive early for good viewing spots!"
+        )
+    },
+    "events": {
+        "found": True,
+        "type": "events",
+        "message": (
+            "🎉 *MOA Events & Entertainment*\n\n"
+            "🏟️ *MOA Arena:*\n"
+            "• Capacity: 15,000-20,000\n"
+            "• Concerts, sports, shows\n"
+            "• Past artists: BTS, Taylor Swift, Bruno Mars\n\n"
+            "🎆 *Regular Events:*\n"
+            "• Fireworks: Fri-Sun @ 7:00 PM\n"
+            "• Seasonal festivals\n"
+            "• Holiday celebrations\n\n"
+            "🏢 *SMX Convention Center:*\n"
+            "• Exhibitions & trade shows\n"
+            "• Corporate events\n"
+            "• Conferences\n\n"
+            "📞 For event booking: Visit SMX or Arena websites"
+        )
+    },
+    "facilities": {
+        "found": True,
+        "type": "facilities",
+        "message": (
+            "🏢 *MOA Facilities & Services*\n\n"
+            "🚻 *Restrooms:* Each floor, all wings\n"
+            "👶 *Nursing Rooms:* Main Mall Level 2\n"
+            "🙏 *Prayer Rooms:* South Wing 3rd Floor\n"
+            "🏧 *ATMs:* Ground Floor near entrances\n"
+            "🏦 *Banks:* BDO, BPI, Metrobank branches\n"
+            "⚕️ *Medical Clinic:* Ground Floor, Main Mall\n"
+            "♿ *Wheelchair Access:* All entrances\n"
+            "📞 *Customer Service:* (02) 8556-0680\n\n"
+            "🆘 *Emergency Services:*\n"
+            "• First Aid stations\n"
+            "• Security roving 24/7\n"
+            "• Police station in complex"
+        )
+    },
+    "lost_and_found": {
+        "found": True,
+        "type": "service",
+        "message": (
+            "🔍 *Lost & Found*\n\n"
+            "📍 *Location:*\n"
+            "Customer Service / Concierge Desk\n"
+            "Ground Floor, Main Atrium\n\n"
+            "📞 *Contact:*\n"
+            "(02) 8556-0680 local 200\n\n"
+            "🕐 *Hours:* 10:00 AM - 10:00 PM\n\n"
+            "💡 *What to bring:*\n"
+            "• Valid ID\n"
+            "• Description of lost item\n"
+            "• Approximate time/location of loss"
+        )
+    },
+    "history": {
+        "found": True,
+        "type": "history",
+        "message": (
+            "📜 *SM Mall of Asia History*\n\n"
+            "📅 *May 21, 2006:* Grand Opening\n"
+            "• Built on reclaimed land\n"
+            "• 42 hectares, 589,891 m² GFA\n\n"
+            "🏗️ *Major Milestones:*\n"
+            "• 2012: MOA Arena opens\n"
+            "• 2015: APEC Meetings hosted\n"
+            "• 2016: Conrad Manila Hotel\n"
+            "• 2019+: Continuous expansions\n\n"
+            "🏢 *Developer:*\n"
+            "SM Prime Holdings, Inc.\n"
+            "Founded by Henry Sy Sr.\n\n"
+            "🌟 *Notable Events:*\n"
+            "• International concerts\n"
+            "• PBA/NCAA games\n"
+            "• National celebrations"
+        )
+    },
+    "wifi": {
+        "found": True,
+        "type": "service",
+        "message": (
+            "📶 *Free WiFi Available*\n\n"
+            "🌐 *Network:* SM_WiFi\n"
+            "📍 *Coverage:* Mall-wide\n\n"
+            "🔑 *How to Connect:*\n"
+            "1. Select 'SM_WiFi' network\n"
+            "2. Open browser\n"
+            "3. Accept terms & conditions\n"
+            "4. Enter mobile number for OTP\n"
+            "5. You're connected!\n\n"
+            "⏱️ *Session:* 2 hours per connection\n"
+            "🔄 *Re-connect:* Unlimited"
+        )
+    },
+    "pets": {
+        "found": True,
+        "type": "policy",
+        "message": (
+            "🐾 *Pet Policy*\n\n"
+            "✅ *Pets Welcome!*\n"
+            "Pets are allowed in designated pet-friendly zones.\n\n"
+            "📋 *Requirements:*\n"
+            "• Must be on leash\n"
+            "• Well-behaved\n"
+            "• Owner responsible for cleanup\n\n"
+            "🚫 *Restrictions:*\n"
+            "• Not allowed in food areas\n"
+            "• Not allowed in certain stores\n\n"
+            "💡 Check with security for designated areas!"
+        )
+    },
+    "general": {
+        "found": False,
+        "type": "general",
+        "message": (
+            "🤔 I'm not sure about that specific question.\n\n"
+            "I can help you with:\n\n"
+            "🛍️ *Shopping*\n"
+            "• Store locations & hours\n"
+            "• Brands & directory\n\n"
+            "🅿️ *Parking & Transport*\n"
+            "• Rates & locations\n"
+            "• How to get here\n\n"
+            "🍽️ *Dining*\n"
+            "• Restaurants & prices\n"
+            "• Cuisine types\n\n"
+            "🎉 *Events*\n"
+            "• Fireworks, concerts\n"
+            "• Arena schedule\n\n"
+            "🏢 *Services*\n"
+            "• Lost & found\n"
+            "• Customer service\n"
+            "• WiFi, ATMs, facilities\n\n"
+            "📞 *For urgent matters:*\n"
+            "Call (02) 8556-0680\n\n"
+            "Try asking your question differently!"
+        )
+    }
+}
+
+# Answers stitched together from the sections above
+TRAFFIC["parking"] = {
+    "found": True,
+    "type": "parking",
+    "message": TRAFFIC["parking_rates"]["message"] + "\n\n" + TRAFFIC["parking_locations"]["message"]
+}
+TRAFFIC["parking_suggestion"] = {
+    "found": True,
+    "type": "parking",
+    "message": "💡 Did you mean *parking*?\n\n" + TRAFFIC["parking_rates"]["message"]
+}
+
+# Menu selections (the "category" field) -> answer key
+TRAFFIC_MENU = {
+    'parking_rates': 'parking_rates',
+    'parking_locations': 'parking_locations',
+    'public_transport': 'public_transport',
+    'traffic_tips': 'traffic_tips',
+    'peak_hours': 'traffic_tips',
+    'walking_directions': 'walking_directions',
+}
+
+COMPANY_MENU = {
+    'overview': 'overview',
+    'facilities': 'facilities',
+    'statistics': 'statistics',
+    'stats': 'statistics',
+    'history': 'history',
+    'ownership': 'ownership',
+    'management': 'ownership',
+    'events': 'events',
+}
+
+# Keywords for intelligent routing
+ASSISTANT_KEYWORDS = {
+    # Shopping & Stores
+    'store_hours': ['hours', 'open', 'close', 'operating', 'time'],
+    'store_location': ['where is', 'find', 'location of', 'uniqlo', 'h&m', 'zara', 'nike'],
+    'shopping': ['shop', 'store', 'brand', 'buy', 'purchase'],
+
+    # Parking & Transportation
+    'parking': ['park', 'parking', 'car'],
+    'parking_rate': ['parking rate', 'parking cost', 'parking price', 'parking fee', 'how much park'],
+    'parking_location': ['where to park', 'parking building', 'parking area'],
+    'transport': ['how to get', 'mrt', 'lrt', 'bus', 'jeep', 'transport', 'commute'],
+    'traffic': ['traffic', 'congestion', 'peak hours', 'rush hour'],
+
+    # Dining
+    'dining': ['restaurant', 'food', 'eat', 'dine', 'cafe', 'coffee'],
+    'cuisine': ['italian', 'filipino', 'japanese', 'chinese', 'korean', 'buffet'],
+    'price_range': ['price', 'cost', 'expensive', 'cheap', 'budget'],
+
+    # Events & Entertainment
+    'events': ['event', 'concert', 'show', 'festival', 'fireworks', 'pyromusical'],
+    'arena': ['arena', 'moa arena', 'concert venue'],
+    'smx': ['smx', 'convention', 'conference'],
+
+    # Facilities & Services
+    'facilities': ['facility', 'restroom', 'cr', 'atm', 'bank', 'clinic', 'wheelchair'],
+    'services': ['service', 'lost and found', 'customer service', 'help desk'],
+
+    # Company Info
+    'history': ['history', 'when opened', 'founded', 'established'],
+    'ownership': ['owner', 'who owns', 'sm prime', 'developer'],
+    'financials': ['revenue', 'financial', 'stock', 'shares'],
+
+    # Accessibility
+    'accessibility': ['wheelchair', 'accessible', 'ramp', 'elevator', 'disability'],
+    'safety': ['safe', 'security', 'emergency', 'first aid'],
+}
+
+
+# Free-text routing rules per endpoint, highest priority first. An intent
+# fires when every keyword group has at least one hit; the handlers fall back
+# to 'help' / 'complete' / 'general' when nothing fires.
+TRAFFIC_TRANSPORT_WORDS = ['mrt', 'lrt', 'train', 'metro', 'subway', 'bus', 'transport', 'commute']
+TRAFFIC_WALK_WORDS = ['walk', 'direction', 'how to get', 'how do i get', 'route']
+
+ROUTING_RULES = {
+    'traffic': [
+        ('parking_rates', [['park'], ['rate', 'price', 'cost', 'how much', 'fee', 'charge']]),
+        ('parking_locations', [['park'], ['where', 'location', 'find', 'area', 'building']]),
+        ('parking', [['park']]),
+        ('public_transport', [TRAFFIC_TRANSPORT_WORDS]),
+        ('traffic_tips', [['traffic', 'rush', 'peak', 'busy', 'crowded', 'when', 'time']]),
+        ('public_transport', [TRAFFIC_WALK_WORDS, ['mrt', 'lrt', 'train', 'bus']]),
+        ('walking_directions', [TRAFFIC_WALK_WORDS]),
+        ('parking_suggestion', [['car', 'vehicle', 'auto', 'drive']]),
+    ],
+    'company': [
+        ('overview', [['overview', 'about', 'what is', 'summary']]),
+        ('facilities', [['facility', 'facilities', 'venue', 'arena', 'ikea', 'rink']]),
+        ('statistics', [['statistic', 'stats', 'number', 'size', 'capacity', 'traffic', 'visit']]),
+        ('history', [['history', 'when', 'opened', 'built', 'timeline']]),
+        ('ownership', [['owner', 'ownership', 'sm prime', 'developer', 'company', 'management']]),
+        ('events', [['event', 'concert', 'show', 'festival', 'pyromusical']]),
+    ],
+    'assistant': [
+        ('hours', [ASSISTANT_KEYWORDS['store_hours']]),
+        ('parking_rates', [['parking'], ['rate', 'cost', 'price', 'fee', 'how much']]),
+        ('transport', [ASSISTANT_KEYWORDS['transport']]),
+        ('vikings', [ASSISTANT_KEYWORDS['dining'], ['vikings']]),
+        ('manam', [ASSISTANT_KEYWORDS['dining'], ['manam']]),
+        ('dining', [ASSISTANT_KEYWORDS['dining']]),
+        ('fireworks', [ASSISTANT_KEYWORDS['events'], ['firework', 'pyromusical']]),
+        ('events', [ASSISTANT_KEYWORDS['events']]),
+        ('facilities', [ASSISTANT_KEYWORDS['facilities']]),
+        ('lost_and_found', [['lost', 'found']]),
+        ('history', [ASSISTANT_KEYWORDS['history']]),
+        ('wifi', [['wifi', 'internet']]),
+        ('pets', [['pet', 'dog', 'cat']]),
+    ],
+}
+
+SECTIONS = {
+    'traffic': TRAFFIC,
+    'company': COMPANY,
+    'assistant': ASSISTANT,
+}
+
+
+class ContentRegistry:
+    """Every canned answer, JSON-encoded once with the app's encoder"""
+
+    def __init__(self, dumps, sections=SECTIONS):
+        self._bodies = {
+            section: {key: (dumps(payload) + "\n").encode() for key, payload in answers.items()}
+            for section, answers in sections.items()
+        }
+        # Changes whenever any answer or the way questions are routed to them does
+        digest = hashlib.sha1(dumps([ROUTING_RULES, TRAFFIC_MENU, COMPANY_MENU]).encode())
+        for section in sorted(self._bodies):
+            for key in sorted(self._bodies[section]):
+                digest.update(f"{section}/{key}\0".encode() + self._bodies[section][key])
+        self.version = digest.hexdigest()[:12]
+
+    def body(self, section, key):
+        return self._bodies[section][key]
@@ -0,0 +1,179 @@
+"""
+Structured JSON logs that never make a request wait on I/O.
+
+log_event() puts a dict on a bounded in-memory queue and returns; a
+background thread drains the queue in batches, encodes each event as one
+JSON line and writes the batch with a single write(). When the queue is
+full the event is dropped and counted instead of blocking - the writer
+reports the count in a log_dropped event as soon as it catches up.
+
+    from event_log import log_event
+    log_event('catalog_reloaded', mall='moa', version=new_version)
+
+    {"ts": 1760772012.481, "event": "catalog_reloaded", "pid": 4242, "mall": "moa", "version": "..."}
+
+By default lines go to stdout. configure(path=...) writes to a file instead,
+rotated by size (path.1 ... path.N); "{pid}" in the path gives every worker
+its own file, since several processes can't safely rotate one file:
+
+    LOG_FILE=/var/log/moa/app-{pid}.jsonl LOG_MAX_MB=20 LOG_BACKUPS=5
+"""
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+MAX_QUEUE = 10000
+BATCH_SIZE = 256
+
+
+class EventLog:
+    """Bounded queue of events, drained to stdout or a size-rotated file by one writer thread"""
+
+    def __init__(self, path=None, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE, flush_interval=0.5,
+                 max_bytes=10 * 1024 * 1024, backups=3, stream=None):
+        self.path = path
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.stream = stream
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Fresh queue and no writer (in a forked worker, the parent's thread doesn't exist)"""
+        self._queue = queue.Queue(self.max_queue)
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self.dropped = 0
+        self.written = 0
+        self.rotations = 0
+        self._reported_drops = 0
+
+    def __call__(self, event, **fields):
+        record = {"ts": round(time.time(), 6), "event": event, "pid": os.getpid()}
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._writer is None:
+            self._start()
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "max_queue": self.max_queue, "written": self.written,
+                "dropped": self.dropped, "rotations": self.rotations, "path": self._path()}
+
+    def _start(self):
+        with self._start_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain_forever, name='event-log', daemon=True)
+                self._writer.start()
+
+    def _path(self):
+        return self.path.replace('{pid}', str(os.getpid())) if self.path else None
+
+    def _drain_forever(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            self._write_batch(batch)
+
+    def _take_batch(self, batch):
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        batch = self._take_batch(batch)
+        if self.dropped != self._reported_drops:
+            batch.append({"ts": round(time.time(), 6), "event": "log_dropped", "pid": os.getpid(),
+                          "dropped": self.dropped - self._reported_drops, "dropped_total": self.dropped})
+            self._reported_drops = self.dropped
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        with self._write_lock:
+            try:
+                self._write(data)
+                self.written += len(batch)
+            except (OSError, ValueError) as e:
+                sys.stderr.write(f"⚠️  Event log write failed, {len(batch)} events lost: {e}\n")
+
+    def _write(self, data):
+        if not self.path:
+            stream = self.stream or sys.stdout
+            stream.write(data)
+            stream.flush()
+            return
+
+        encoded = data.encode('utf-8')
+        if self._file is not None and self._size and self._size + len(encoded) > self.max_bytes:
+            self._rotate()
+        if self._file is None:
+            path = self._path()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'ab')
+            self._size = self._file.tell()
+        self._file.write(encoded)
+        self._file.flush()
+        self._size += len(encoded)
+
+    def _rotate(self):
+        """path -> path.1 -> ... -> path.<backups> (the oldest is dropped)"""
+        self._file.close()
+        self._file = None
+        path = self._path()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if self.backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+        self.rotations += 1
+
+    def flush(self):
+        """Write out everything queued so far (from the calling thread)"""
+        while True:
+            try:
+                batch = [self._queue.get_nowait()]
+            except queue.Empty:
+                return
+            self._write_batch(batch)
+
+
+LOG = EventLog()
+atexit.register(lambda: LOG.flush())
+
+
+def configure(**settings):
+    """Replace the process-wide log (flushing the old one); keyword arguments as for EventLog"""
+    global LOG
+    LOG.flush()
+    LOG = EventLog(**settings)
+    return LOG
+
+
+def log_event(event, **fields):
+    """Queue one structured event on the process-wide log; never blocks"""
+    LOG(event, **fields)
+
+
+def log_stats():
+    return LOG.stats()
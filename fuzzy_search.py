@@ -0,0 +1,136 @@
+"""
+Typo-tolerant shop lookups ("starbuks", "shakeshack", "uniqlo store").
+
+Keys are compacted (lowercase, letters and digits only) and indexed by their
+padded trigrams. A query is split into contiguous word spans ("uniqlo store"
+-> "uniqlo", "store", "uniqlostore"); the trigrams of each span are
+counted against the index postings, and only the few keys sharing the most
+trigrams are checked with a bounded edit distance. Nothing ever runs
+Levenshtein over the whole catalog.
+"""
+
+from collections import Counter
+
+MAX_SPAN_WORDS = 4
+MAX_CANDIDATES = 25
+STOP_GRAM_MIN = 50
+STOP_GRAM_FRACTION = 20
+
+
+def compact(text):
+    """Lowercase text keeping only letters and digits"""
+    return ''.join(ch for ch in text.lower() if ch.isalnum())
+
+
+def trigrams(text):
+    padded = f"^{text}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(text):
+    """Typos allowed for a query word of this length"""
+    if len(text) <= 4:
+        return 1
+    if len(text) <= 8:
+        return 2
+    return 3
+
+
+def bounded_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 as soon as it is
+    certain the distance is larger than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, ch_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, ch_b in enumerate(b, 1):
+            cost = previous[j - 1] if ch_a == ch_b else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def word_spans(query):
+    """Compacted contiguous word runs of query, up to MAX_SPAN_WORDS words long"""
+    words = [compact(word) for word in query.split()]
+    words = [word for word in words if word]
+    spans = set()
+    for start in range(len(words)):
+        for end in range(start + 1, min(len(words), start + MAX_SPAN_WORDS) + 1):
+            spans.add(''.join(words[start:end]))
+    return spans
+
+
+class FuzzyIndex:
+    """Trigram candidate index over the keys of a shops dict"""
+
+    def __init__(self, keys):
+        self._keys = []
+        self._compact = []
+        postings = {}
+
+        for position, key in enumerate(keys):
+            self._keys.append(key)
+            self._compact.append(compact(key))
+            for gram in trigrams(self._compact[-1]):
+                postings.setdefault(gram, []).append(position)
+
+        self._postings = {gram: tuple(positions) for gram, positions in postings.items()}
+
+    def _matches(self, span):
+        """(position, distance) for the closest keys within max_edits(span) of span"""
+        allowed = max_edits(span)
+        grams = trigrams(span)
+
+        # Trigrams shared by a large slice of the catalog ("ore$" in every
+        # "... store") say little and would dominate the counting cost
+        common = max(STOP_GRAM_MIN, len(self._keys) // STOP_GRAM_FRACTION)
+        lists = [self._postings.get(gram, ()) for gram in grams]
+        selective = [positions for positions in lists if len(positions) <= common] or lists
+
+        shared = Counter()
+        for positions in selective:
+            shared.update(positions)
+
+        # One edit destroys at most 3 trigrams, so a key within d edits
+        # shares at least len(selective) - 3d of the counted ones
+        best = allowed
+        for position, count in shared.most_common(MAX_CANDIDATES):
+            if count < max(1, len(selective) - 3 * best):
+                break
+            target = self._compact[position]
+            if abs(len(target) - len(span)) > best:
+                continue
+            distance = bounded_distance(span, target, best)
+            if distance <= best:
+                best = distance
+                yield position, distance
+
+    def suggest(self, query, limit=5):
+        """
+        Return up to limit (key, distance) pairs ranked best first.
+        Only keys within max_edits() of some word span of query are returned.
+        """
+        best = {}
+        for span in word_spans(query):
+            for position, distance in self._matches(span):
+                if distance < best.get(position, distance + 1):
+                    best[position] = distance
+
+        ranked = sorted(best, key=lambda position: (best[position], position))
+        return [(self._keys[position], best[position]) for position in ranked[:limit]]
@@ -0,0 +1,102 @@
+"""
+Keyword intent router shared by /assistant, /traffic and /company.
+
+Every keyword of every routing rule is compiled into a single Aho-Corasick
+automaton at startup. Classifying a question is one pass over its characters:
+each keyword hit marks the rule groups it satisfies, and the answer is the
+highest-priority rule whose groups are all satisfied. Keywords match as plain
+substrings, exactly like the `word in question` checks they replace.
+
+Rules are declared per domain, in priority order:
+
+    {'traffic': [
+        ('parking_rates', [['park'], ['rate', 'price', 'fee']]),   # park AND rate-ish
+        ('parking', [['park']]),
+    ]}
+"""
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a fixed keyword list"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            node = 0
+            for ch in keyword:
+                if ch not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[node][ch] = len(self._goto) - 1
+                node = self._goto[node][ch]
+            self._output[node] += (keyword_id,)
+
+        # Breadth-first fail links; outputs of the fail target are merged in
+        # so a match never has to walk the fail chain at query time
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def find(self, text):
+        """Set of keyword ids occurring anywhere in text"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+class IntentRouter:
+    """Priority-ordered keyword rules for several domains behind one automaton"""
+
+    def __init__(self, rules):
+        self._intents = {}
+        keyword_ids = {}
+        # keyword id -> [(domain, rule index, group index), ...]
+        targets = []
+
+        for domain, domain_rules in rules.items():
+            self._intents[domain] = []
+            for rule_index, (intent, groups) in enumerate(domain_rules):
+                self._intents[domain].append((intent, len(groups)))
+                for group_index, group in enumerate(groups):
+                    for keyword in group:
+                        if keyword not in keyword_ids:
+                            keyword_ids[keyword] = len(keyword_ids)
+                            targets.append([])
+                        targets[keyword_ids[keyword]].append((domain, rule_index, group_index))
+
+        self._automaton = KeywordAutomaton(keyword_ids)
+        self._targets = [tuple(target) for target in targets]
+
+    def classify(self, domain, text, default=None):
+        """Highest-priority intent of domain whose keyword groups all occur in text"""
+        satisfied = {}
+        for keyword_id in self._automaton.find(text):
+            for target_domain, rule_index, group_index in self._targets[keyword_id]:
+                if target_domain == domain:
+                    satisfied.setdefault(rule_index, set()).add(group_index)
+
+        intents = self._intents[domain]
+        for rule_index in sorted(satisfied):
+            intent, group_count = intents[rule_index]
+            if len(satisfied[rule_index]) == group_count:
+                return intent
+        return default
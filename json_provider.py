@@ -0,0 +1,75 @@
+"""
+Fast JSON provider for the Flask apps.
+
+Encodes (jsonify, pre-rendered bodies) and decodes (request.get_json) with
+orjson (in requirements.txt) when it is installed, and with the stdlib json
+module otherwise. Output is compact with sorted keys either way. orjson
+writes non-ASCII text (emoji, "–") as UTF-8 while the stdlib keeps Flask's
+\\u escapes (its fastest mode), so the bytes differ but every client decodes
+exactly the same strings.
+
+Anything orjson refuses to encode (non-string keys, ints over 64 bits) is
+retried with the stdlib, and so are request bodies it can't parse (NaN,
+invalid UTF-8).
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that hands the work to orjson when it can"""
+
+    use_orjson = orjson is not None
+
+    def _orjson_option(self):
+        # datetimes/dataclasses go through self.default, exactly like the stdlib path
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def _fast_encode(self, obj):
+        """orjson bytes for obj, or None when the stdlib has to do it"""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_option())
+            except TypeError:
+                pass
+        return None
+
+    def _encode(self, obj):
+        """Compact UTF-8 JSON bytes for obj"""
+        encoded = self._fast_encode(obj)
+        if encoded is None:
+            encoded = super().dumps(obj, separators=COMPACT_SEPARATORS).encode()
+        return encoded
+
+    def dumps(self, obj, **kwargs):
+        """Compact JSON text; extra json.dumps options (indent, cls, ...) use the stdlib"""
+        if not kwargs or kwargs == {'separators': COMPACT_SEPARATORS}:
+            encoded = self._fast_encode(obj)
+            if encoded is not None:
+                return encoded.decode()
+        kwargs.setdefault('separators', COMPACT_SEPARATORS)
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,222 @@
+"""
+Per-mall catalog shards.
+
+Each mall has its own catalog, loaded the first time a request names that
+mall and built independently of every other mall. Loaded shards are kept in
+LRU order and the least recently used ones are evicted once the total
+(approximate) size goes over the memory budget, so a worker serving mostly
+MOA traffic never pays for the other malls.
+
+Shards come from MALLS_DIR (or an explicit path per mall):
+
+    malls/moa.json        {"name": "SM Mall of Asia", "popular": [...], "search_hints": [...],
+                           "shops": {key: shop}}
+    malls/megamall.csv    key,name,location,category rows
+    malls/north.db        a SQLite catalog built by sqlite_catalog.py
+
+Editing a shard file doesn't need a redeploy: reload() (run by the watcher
+thread or on SIGHUP) builds a fresh Catalog off to the side and publishes it
+with one reference assignment. Requests never take a lock to find a catalog;
+one that is already running keeps the snapshot it started with.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+
+from catalog import Catalog, read_shard
+from event_log import log_event
+from sqlite_catalog import SQLiteCatalog
+
+MALL_ID_PATTERN = re.compile(r'^[a-z0-9_-]{1,64}$')
+SHARD_EXTENSIONS = ('.db', '.json', '.csv')
+
+
+def deep_sizeof(obj):
+    """Approximate bytes held by obj and everything reachable through containers/attributes"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(item.__dict__)
+    return total
+
+
+def file_stamp(path):
+    """(mtime, size) of path, or None if it is gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Shard:
+    """A loaded mall: its current catalog and the file it was built from"""
+
+    __slots__ = ('catalog', 'size', 'path', 'stamp', 'last_used')
+
+    def __init__(self, catalog, size, path, stamp):
+        self.catalog = catalog
+        self.size = size
+        self.path = path
+        self.stamp = stamp
+        self.last_used = time.monotonic()
+
+
+class MallRegistry:
+    """Lazily loaded, LRU-evicted, hot-reloadable catalogs keyed by mall id"""
+
+    def __init__(self, malls_dir, dumps, files=None, pinned=(), budget_bytes=256 * 1024 * 1024):
+        self.malls_dir = malls_dir
+        self.budget_bytes = budget_bytes
+        self._dumps = dumps
+        self._files = dict(files or {})
+        self._pinned = set(pinned)
+        # mall id -> Shard. Writers replace the whole dict under _lock;
+        # readers just look it up.
+        self._published = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def available(self):
+        """Every mall id that can be served"""
+        malls = set(self._files)
+        if os.path.isdir(self.malls_dir):
+            for filename in os.listdir(self.malls_dir):
+                mall_id, ext = os.path.splitext(filename)
+                if ext in SHARD_EXTENSIONS and MALL_ID_PATTERN.match(mall_id):
+                    malls.add(mall_id)
+        return sorted(malls)
+
+    def loaded(self):
+        """{mall id: approx bytes} for the shards currently in memory"""
+        return {mall_id: shard.size for mall_id, shard in self._published.items()}
+
+    def versions(self):
+        """{mall id: catalog version} for the shards currently in memory"""
+        return {mall_id: shard.catalog.version for mall_id, shard in self._published.items()}
+
+    def get(self, mall_id):
+        """Catalog for mall_id, loading it on first use; None for unknown malls"""
+        shard = self._published.get(mall_id)
+        if shard is not None:
+            shard.last_used = time.monotonic()
+            return shard.catalog
+
+        path = self._source(mall_id)
+        if path is None:
+            return None
+
+        # Only one thread builds a given mall; other malls keep loading in parallel
+        with self._load_lock(mall_id):
+            shard = self._published.get(mall_id)
+            if shard is not None:
+                return shard.catalog
+
+            stamp = file_stamp(path)
+            catalog = self._build(path)
+            self._publish(mall_id, Shard(catalog, deep_sizeof(catalog), path, stamp))
+            return catalog
+
+    def reload(self, mall_id=None, force=False):
+        """
+        Rebuild loaded shards whose file changed (all of them with force=True).
+
+        A shard that fails to load keeps serving its previous catalog.
+        Returns the mall ids that were swapped.
+        """
+        mall_ids = [mall_id] if mall_id is not None else list(self._published)
+        swapped = []
+        for mall_id in mall_ids:
+            with self._load_lock(mall_id):
+                current = self._published.get(mall_id)
+                if current is None:
+                    continue
+                path = self._source(mall_id) or current.path
+                stamp = file_stamp(path)
+                if stamp is None or (stamp == current.stamp and path == current.path and not force):
+                    continue
+                try:
+                    catalog = self._build(path)
+                except Exception as e:
+                    log_event('catalog_reload_failed', mall=mall_id, path=path, kept_version=current.catalog.version,
+                              error=str(e))
+                    continue
+
+                shard = Shard(catalog, deep_sizeof(catalog), path, stamp)
+                shard.last_used = current.last_used
+                if self._publish(mall_id, shard, replace_only=True):
+                    log_event('catalog_reloaded', mall=mall_id, path=path, old_version=current.catalog.version,
+                              version=catalog.version)
+                    swapped.append(mall_id)
+        return swapped
+
+    def watch(self, interval):
+        """Poll loaded shard files every interval seconds and reload changed ones"""
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    log_event('catalog_watcher_error', error=str(e))
+
+        watcher = threading.Thread(target=poll, daemon=True)
+        watcher.start()
+        return watcher
+
+    def _load_lock(self, mall_id):
+        with self._lock:
+            return self._load_locks.setdefault(mall_id, threading.Lock())
+
+    def _source(self, mall_id):
+        """Shard file for mall_id, or None for unknown malls"""
+        if not MALL_ID_PATTERN.match(mall_id):
+            return None
+        if mall_id in self._files:
+            return self._files[mall_id]
+        for ext in SHARD_EXTENSIONS:
+            path = os.path.join(self.malls_dir, f"{mall_id}{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _build(self, path):
+        if path.endswith('.db'):
+            return SQLiteCatalog(path, self._dumps)
+        return Catalog.from_shard(read_shard(path), self._dumps)
+
+    def _publish(self, mall_id, shard, replace_only=False):
+        """Swap in a new shards dict containing shard; False if replace_only and mall_id was evicted"""
+        with self._lock:
+            if replace_only and mall_id not in self._published:
+                return False
+            published = dict(self._published)
+            published[mall_id] = shard
+            self._evict(published, mall_id)
+            self._published = published
+            return True
+
+    def _evict(self, published, newest):
+        """Drop least recently used shards until the budget fits (caller holds the lock)"""
+        total = sum(shard.size for shard in published.values())
+        for mall_id in sorted(published, key=lambda mall_id: published[mall_id].last_used):
+            if total <= self.budget_bytes:
+                break
+            if mall_id in self._pinned or mall_id == newest:
+                continue
+            total -= published.pop(mall_id).size
@@ -0,0 +1,233 @@
+"""
+Memory instrumentation for chasing slowly growing workers.
+
+Off unless MEMORY_DEBUG_SECRET is set; every endpoint then needs the same
+value in an X-Debug-Secret header, and answers for the worker that happens
+to serve it (tracemalloc state, snapshots and RSS are per process - the pid
+is in every response, and gunicorn's --workers 1 makes it unambiguous).
+
+    GET  /debug/memory                   RSS of this worker (and its sibling gunicorn
+                                         workers), threads, tracemalloc state, snapshots
+    POST /debug/memory/tracemalloc       {"action": "start", "frames": 1} or {"action": "stop"}
+    POST /debug/memory/snapshot          take a named snapshot: {"name": "before"}
+    GET  /debug/memory/top?limit=20      top allocation sites (file:line) now, or ?snapshot=before
+    GET  /debug/memory/diff?from=before  growth per site from a snapshot to now (or &to=after)
+
+A typical session: start tracing, snapshot, send a few thousand requests,
+then diff against the snapshot to see which lines kept their allocations.
+Tracing costs CPU and memory of its own, so stop it when done.
+"""
+
+import hmac
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from flask import abort, jsonify, request
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HEADER = 'X-Debug-Secret'
+MAX_SNAPSHOTS = 8
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Allocations made by the instrumentation itself aren't interesting
+IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes(pid='self'):
+    """Resident set size of a process from /proc, or None where that isn't available"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes():
+    """Highest RSS this process has reached (ru_maxrss is in KiB on Linux), or None without resource"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def sibling_workers():
+    """{pid: rss_bytes} of every gunicorn worker sharing this worker's master ({} otherwise)"""
+    master = os.getppid()
+    try:
+        with open(f'/proc/{master}/cmdline', 'rb') as f:
+            if b'gunicorn' not in f.read():
+                return {}
+        pids = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return {}
+
+    workers = {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # The command name may contain spaces; ppid is the 2nd field after it
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == master:
+            workers[int(pid)] = rss_bytes(pid)
+    return workers
+
+
+def _sites(stats, limit):
+    return [{
+        "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+        "size_kib": round(stat.size / 1024, 1),
+        "count": stat.count,
+        **({"size_diff_kib": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+           if hasattr(stat, 'size_diff') else {}),
+    } for stat in stats[:limit]]
+
+
+class MemoryDebugger:
+    """tracemalloc control and named snapshots for one worker"""
+
+    def __init__(self, secret):
+        self.secret = secret
+        self.snapshots = OrderedDict()  # name -> (taken_at, tracemalloc.Snapshot)
+        self._lock = threading.Lock()
+
+    def authorized(self):
+        presented = request.headers.get(HEADER, '')
+        return bool(presented) and hmac.compare_digest(presented.encode(), self.secret.encode())
+
+    def status(self):
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "rss_bytes": rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "workers": sibling_workers(),
+            "threads": sorted(thread.name for thread in threading.enumerate()),
+            "tracemalloc": {
+                "tracing": tracemalloc.is_tracing(),
+                "frames": tracemalloc.get_traceback_limit(),
+                "traced_bytes": current,
+                "traced_peak_bytes": peak,
+                "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            },
+            "snapshots": [{"name": name, "taken_at": round(taken_at, 3)}
+                          for name, (taken_at, snapshot) in self.snapshots.items()],
+        }
+
+    def start(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        """Stop tracing; snapshots already taken stay readable"""
+        tracemalloc.stop()
+
+    def take(self, name=None):
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not running; POST /debug/memory/tracemalloc {\"action\": \"start\"} first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED)
+        with self._lock:
+            name = name or f"s{len(self.snapshots) + 1}"
+            self.snapshots.pop(name, None)
+            self.snapshots[name] = (time.time(), snapshot)
+            while len(self.snapshots) > MAX_SNAPSHOTS:
+                self.snapshots.popitem(last=False)
+        return name
+
+    def get(self, name):
+        """Named snapshot, or a fresh one for None"""
+        if name is None:
+            if not tracemalloc.is_tracing():
+                raise ValueError("tracemalloc is not running")
+            return tracemalloc.take_snapshot().filter_traces(IGNORED)
+        try:
+            return self.snapshots[name][1]
+        except KeyError:
+            raise ValueError(f"No snapshot named '{name}' in worker {os.getpid()}") from None
+
+    def top(self, name=None, limit=20):
+        return _sites(self.get(name).statistics('lineno'), limit)
+
+    def diff(self, older, newer=None, limit=20):
+        return _sites(self.get(newer).compare_to(self.get(older), 'lineno'), limit)
+
+
+def parse_limit(value, default=20):
+    try:
+        return max(1, min(int(value), 500)) if value else default
+    except ValueError:
+        return default
+
+
+def install_memory_debug(app, secret):
+    """Serve the /debug/memory endpoints on app; does nothing without a secret"""
+    if not secret:
+        return None
+    debugger = MemoryDebugger(secret)
+
+    def guarded(view):
+        def wrapper():
+            if not debugger.authorized():
+                abort(404)
+            try:
+                return view()
+            except ValueError as e:
+                return jsonify({"error": str(e), "pid": os.getpid()}), 400
+        wrapper.__name__ = view.__name__
+        return wrapper
+
+    @guarded
+    def memory_status():
+        return jsonify(debugger.status())
+
+    @guarded
+    def memory_tracemalloc():
+        data = request.get_json(force=True, silent=True) or {}
+        action = data.get('action')
+        if action == 'start':
+            debugger.start(int(data.get('frames', 1)))
+        elif action == 'stop':
+            debugger.stop()
+        else:
+            raise ValueError("action must be 'start' or 'stop'")
+        return jsonify({"pid": os.getpid(), **debugger.status()["tracemalloc"]})
+
+    @guarded
+    def memory_snapshot():
+        data = request.get_json(force=True, silent=True) or {}
+        name = debugger.take(data.get('name'))
+        return jsonify({"pid": os.getpid(), "snapshot": name, "snapshots": list(debugger.snapshots)})
+
+    @guarded
+    def memory_top():
+        name = request.args.get('snapshot')
+        return jsonify({"pid": os.getpid(), "snapshot": name or "now",
+                        "sites": debugger.top(name, parse_limit(request.args.get('limit')))})
+
+    @guarded
+    def memory_diff():
+        older = request.args.get('from')
+        if not older:
+            raise ValueError("Please name the snapshot to compare against with ?from=")
+        newer = request.args.get('to')
+        return jsonify({"pid": os.getpid(), "from": older, "to": newer or "now",
+                        "sites": debugger.diff(older, newer, parse_limit(request.args.get('limit')))})
+
+    app.add_url_rule('/debug/memory', 'memory_status', memory_status)
+    app.add_url_rule('/debug/memory/tracemalloc', 'memory_tracemalloc', memory_tracemalloc, methods=['POST'])
+    app.add_url_rule('/debug/memory/snapshot', 'memory_snapshot', memory_snapshot, methods=['POST'])
+    app.add_url_rule('/debug/memory/top', 'memory_top', memory_top)
+    app.add_url_rule('/debug/memory/diff', 'memory_diff', memory_diff)
+    return debugger
@@ -0,0 +1,247 @@
+"""
+Request metrics for every gunicorn worker, served in Prometheus text format.
+
+Metrics is the outermost WSGI middleware, so it also sees responses the
+response cache answers without reaching Flask. Per worker it counts
+requests by (endpoint, method, status) and keeps a latency histogram per
+endpoint; recording one request is a dict lookup, a bisect and a few
+integer adds under a lock.
+
+Workers don't share memory, so each one writes its numbers to
+METRICS_DIR/worker-<pid>.json every flush interval (and at exit). /metrics,
+whichever worker answers it, adds up its own live numbers and every other
+worker's last file. Files of workers that have exited stay, so the totals
+keep counting up like Prometheus counters should. Other per-worker counters
+(e.g. dropped log events) can ride along through the counters callable.
+
+    # HELP moa_http_requests_total Requests handled, by endpoint, method and status.
+    # TYPE moa_http_requests_total counter
+    moa_http_requests_total{endpoint="search",method="GET",status="200"} 42
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from werkzeug.exceptions import HTTPException
+
+from event_log import log_event
+
+# Upper bounds in seconds (the +Inf bucket is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MAX_ROUTE_CACHE = 4096
+
+
+def default_directory():
+    # Workers share their master's pid as parent, so they meet in the same place
+    return os.path.join(tempfile.gettempdir(), f"moa-metrics-{os.getppid()}")
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _TimedBody:
+    """Response body that records its request when the server closes it"""
+
+    __slots__ = ('_result', '_metrics', '_endpoint', '_method', '_status', '_start')
+
+    def __init__(self, result, metrics, endpoint, method, status, start):
+        self._result = result
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._method = method
+        self._status = status
+        self._start = start
+
+    def __iter__(self):
+        return iter(self._result)
+
+    def close(self):
+        try:
+            if hasattr(self._result, 'close'):
+                self._result.close()
+        finally:
+            self._metrics.observe(self._endpoint, self._method, self._status[0],
+                                  time.perf_counter() - self._start)
+
+
+class Metrics:
+    """WSGI middleware recording per-endpoint request counts and latency histograms"""
+
+    def __init__(self, app, url_map, directory=None, flush_interval=2.0, buckets=BUCKETS, counters=None):
+        self.app = app
+        self.buckets = tuple(buckets)
+        self.counters = counters  # callable -> {metric name: (help, value)}, summed like the rest
+        self.flush_interval = flush_interval
+        self._directory = directory
+        self._url_map = url_map
+        self._adapter = None
+        self._routes = {}
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        """Start from zero (in a freshly forked worker, nothing carries over from the master)"""
+        self._lock = threading.Lock()
+        self._requests = {}   # (endpoint, method, status) -> count
+        self._latency = {}    # endpoint -> [count per bucket..., +Inf count, sum]
+        self._flusher = None
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = default_directory()
+        return self._directory
+
+    def _endpoint(self, method, path):
+        """Flask endpoint name for a request path ('unmatched' for 404s)"""
+        key = (method, path)
+        endpoint = self._routes.get(key)
+        if endpoint is None:
+            if self._adapter is None:
+                self._adapter = self._url_map.bind('localhost')
+            try:
+                endpoint = self._adapter.match(path, method)[0]
+            except HTTPException:
+                endpoint = 'unmatched'
+            if len(self._routes) >= MAX_ROUTE_CACHE:
+                self._routes.clear()
+            self._routes[key] = endpoint
+        return endpoint
+
+    def observe(self, endpoint, method, status, seconds):
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                histogram = self._latency[endpoint] = [0] * (len(self.buckets) + 2)
+            histogram[bucket] += 1
+            histogram[-1] += seconds
+        if self._flusher is None and self.flush_interval:
+            self._start_flusher()
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        method = environ.get('REQUEST_METHOD', 'GET')
+        endpoint = self._endpoint(method, environ.get('PATH_INFO', '/'))
+        status = ['500']
+
+        def record_status(status_line, headers, exc_info=None):
+            status[0] = status_line[:3]
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            result = self.app(environ, record_status)
+        except Exception:
+            self.observe(endpoint, method, '500', time.perf_counter() - start)
+            raise
+        # Recorded when the server closes the body, so streaming time counts too
+        return _TimedBody(result, self, endpoint, method, status, start)
+
+    def snapshot(self):
+        counters = {name: value for name, (help_text, value) in self.counters().items()} if self.counters else {}
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "requests": [[*key, count] for key, count in self._requests.items()],
+                "latency": {endpoint: list(histogram) for endpoint, histogram in self._latency.items()},
+                "counters": counters,
+            }
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+        self._flusher.start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                log_event('metrics_flush_failed', directory=self.directory, error=str(e))
+
+    def flush(self):
+        """Write this worker's numbers where the other workers can read them"""
+        snapshot = self.snapshot()
+        if not snapshot["requests"]:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"worker-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """Snapshots of this worker (live) and of every other worker (last flush)"""
+        snapshots = [self.snapshot()]
+        own = f"worker-{os.getpid()}.json"
+        if os.path.isdir(self.directory):
+            for filename in os.listdir(self.directory):
+                if not filename.startswith('worker-') or not filename.endswith('.json') or filename == own:
+                    continue
+                try:
+                    with open(os.path.join(self.directory, filename)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # being replaced right now; it will be there next scrape
+        return snapshots
+
+    def render(self):
+        """Prometheus text exposition of every worker's numbers added up"""
+        requests = {}
+        latency = {}
+        counters = {}
+        workers = 0
+        for snapshot in self.collect():
+            if snapshot["buckets"] != list(self.buckets):
+                continue
+            workers += 1
+            for endpoint, method, status, count in snapshot["requests"]:
+                key = (endpoint, method, status)
+                requests[key] = requests.get(key, 0) + count
+            for endpoint, histogram in snapshot["latency"].items():
+                total = latency.setdefault(endpoint, [0] * len(histogram))
+                for i, value in enumerate(histogram):
+                    total[i] += value
+            for name, value in snapshot.get("counters", {}).items():
+                counters[name] = counters.get(name, 0) + value
+
+        lines = [
+            "# HELP moa_workers_reporting Worker snapshots included in these totals.",
+            "# TYPE moa_workers_reporting gauge",
+            f"moa_workers_reporting {workers}",
+            "# HELP moa_http_requests_total Requests handled, by endpoint, method and status.",
+            "# TYPE moa_http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'moa_http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+                         f'status="{status}"}} {count}')
+
+        lines.append("# HELP moa_http_request_duration_seconds Request latency by endpoint.")
+        lines.append("# TYPE moa_http_request_duration_seconds histogram")
+        for endpoint, histogram in sorted(latency.items()):
+            label = _label(endpoint)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram[:-1]):
+                cumulative += count
+                lines.append(f'moa_http_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'moa_http_request_duration_seconds_sum{{endpoint="{label}"}} {histogram[-1]:.6f}')
+            lines.append(f'moa_http_request_duration_seconds_count{{endpoint="{label}"}} {cumulative}')
+
+        for name, (help_text, value) in sorted((self.counters() if self.counters else {}).items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {counters.get(name, value)}")
+        return "\n".join(lines) + "\n"
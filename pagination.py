@@ -0,0 +1,96 @@
+"""
+Cursor pagination and field projection for shop listings.
+
+Paged listings are in shop key order, and a cursor is an opaque token naming
+the catalog version and the last key served. The next page starts at the
+first key after it (a binary search), so a reload that adds, removes or
+moves shops - even the cursor's own shop - never makes a page skip or repeat
+the shops on either side of it.
+
+    ?limit=10                      first 10 shops + "next_cursor"
+    ?limit=10&cursor=<next_cursor> the 10 after those
+    ?fields=name,location          only those fields of each shop
+"""
+
+import base64
+import json
+from bisect import bisect_right
+from operator import itemgetter
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+SHOP_FIELDS = ('name', 'location', 'category')
+
+
+def encode_cursor(version, key):
+    payload = json.dumps([version, key], separators=(',', ':'), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(version, key) from encode_cursor(); ValueError if it isn't one"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        version, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, str):
+        raise ValueError("Invalid cursor")
+    return version, key
+
+
+def parse_limit(limit, cursor=None):
+    """Page size from a 'limit' parameter; None (no paging) when neither limit nor cursor is given"""
+    if limit in (None, ''):
+        return DEFAULT_PAGE_SIZE if cursor else None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_fields(fields, allowed=SHOP_FIELDS):
+    """'name,location' (or a list) -> ('name', 'location'); None means every field"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    elif not isinstance(fields, (list, tuple)):
+        raise ValueError("fields must be a comma-separated string or a list")
+    fields = tuple(str(field).strip().lower() for field in fields if str(field).strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return fields or None
+
+
+def project(shop, fields):
+    """shop restricted to fields (all of it when fields is None)"""
+    if fields is None:
+        return shop
+    return {field: shop[field] for field in fields if field in shop}
+
+
+def paginate(items, version, cursor=None, limit=None):
+    """
+    One page of (key, value) items, in key order.
+
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    With no limit and no cursor, everything is one page, in the given order.
+    """
+    if limit is None:
+        return items, None
+
+    items = sorted(items, key=itemgetter(0))
+    start = 0
+    if cursor:
+        last_key = decode_cursor(cursor)[1]
+        start = bisect_right(items, last_key, key=itemgetter(0))
+
+    page = items[start:start + limit]
+    if start + limit < len(items):
+        return page, encode_cursor(version, page[-1][0])
+    return page, None
@@ -0,0 +1,173 @@
+"""
+Finding the user's text in whatever JSON a chat platform sends.
+
+Every integration wraps the text differently: Todook posts the body we
+configured ({"shop": "{{user_input}}"}), Messenger nests it in
+entry[0].messaging[0].message.text, Telegram in message.text, and generic
+bots use one of a handful of flat field names. A PayloadExtractor holds an
+ordered list of declarative rules - (platform, dotted path) - and returns
+the first non-empty scalar a rule points at:
+
+    SEARCH = PayloadExtractor(rules(
+        ('todook', 'shop'), ('generic', 'name'), ('telegram', 'message.text'),
+        ('messenger', 'entry.0.messaging.0.message.text'),
+    ))
+    SEARCH.extract({"message": {"chat": {"id": 7}, "text": "uniqlo"}})  # ('uniqlo', 'telegram')
+
+A final path segment '*' matches the first key (in the payload's own order)
+holding a non-empty string, for "the first string anywhere" fallbacks.
+
+Payloads from one integration always have the same top-level keys, so the
+rules are narrowed once per key set: the tuple of top-level keys is mapped
+to the rules whose first segment is among them (plus top-level '*' rules),
+and later payloads with those keys only try that short list - usually one
+direct path lookup. The values are still checked on every call, so an empty
+field never hides a later rule. Payloads with more than MAX_SHAPE_KEYS keys
+or longer keys than MAX_SHAPE_CHARS in total skip the cache and try every
+rule, so no client can make the cache hold big keys.
+"""
+
+from collections import namedtuple
+
+Rule = namedtuple('Rule', 'platform path')
+
+MAX_SHAPES = 1024
+MAX_SHAPE_KEYS = 16
+MAX_SHAPE_CHARS = 512
+_MISSING = object()
+
+
+def rules(*specs):
+    """[Rule] from (platform, 'dotted.path') pairs; numeric segments index lists"""
+    parsed = []
+    for platform, path in specs:
+        parts = tuple(int(part) if part.isdigit() else part for part in path.split('.'))
+        if '*' in parts[:-1]:
+            raise ValueError(f"'*' can only be the last segment: {path!r}")
+        parsed.append(Rule(platform, parts))
+    return parsed
+
+
+def _text(value):
+    """value as text if it is a non-empty scalar, else None"""
+    if not value or value is _MISSING or isinstance(value, (dict, list)):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _lookup(payload, path):
+    value = payload
+    for part in path:
+        if isinstance(part, int):
+            if not isinstance(value, list) or part >= len(value):
+                return _MISSING
+        elif not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _first_string_key(value):
+    """Key of the first non-empty string in a dict, or None"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if item and isinstance(item, str):
+                return key
+    return None
+
+
+def _match(payload, rules):
+    """(concrete path, platform) of the first rule with text in payload, or None"""
+    for platform, path in rules:
+        if path[-1] == '*':
+            key = _first_string_key(_lookup(payload, path[:-1]))
+            if key is None:
+                continue
+            path = path[:-1] + (key,)
+        if _text(_lookup(payload, path)) is not None:
+            return path, platform
+    return None
+
+
+class PayloadExtractor:
+    """Ordered path rules, narrowed once per top-level key set"""
+
+    def __init__(self, rules, max_shapes=MAX_SHAPES):
+        self.rules = list(rules)
+        self.max_shapes = max_shapes
+        self._shapes = {}  # tuple of top-level keys -> the rules that can match such payloads
+        self.hits = 0
+        self.misses = 0
+
+    def _search(self, payload):
+        return _match(payload, self.rules)
+
+    def _plan(self, keys):
+        """(first field, its platform, remaining rules) for payloads with these top-level keys"""
+        present = set(keys)
+        candidates = [rule for rule in self.rules if rule.path[0] == '*' or rule.path[0] in present]
+        if candidates and len(candidates[0].path) == 1 and candidates[0].path[0] != '*':
+            # The common Todook/generic case: a flat field, read straight from the payload
+            first = candidates.pop(0)
+            return first.path[0], first.platform, tuple(candidates)
+        return None, None, tuple(candidates)
+
+    def extract(self, payload):
+        """(text, platform) for payload, or ('', None) when no rule finds any text"""
+        if not isinstance(payload, dict) or not payload:
+            return '', None
+        if len(payload) > MAX_SHAPE_KEYS:
+            match = _match(payload, self.rules)
+        else:
+            keys = tuple(payload)
+            plan = self._shapes.get(keys)
+            if plan is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                plan = self._plan(keys)
+                if sum(map(len, keys)) <= MAX_SHAPE_CHARS:
+                    if len(self._shapes) >= self.max_shapes:
+                        self._shapes.clear()
+                    self._shapes[keys] = plan
+            field, platform, candidates = plan
+            if field is not None:
+                value = payload[field]
+                if value and value.__class__ is str:
+                    return value, platform
+                text = _text(value)
+                if text is not None:
+                    return text, platform
+            match = _match(payload, candidates)
+        if match is None:
+            return '', None
+        path, platform = match
+        return _text(_lookup(payload, path)), platform
+
+    def text(self, payload):
+        return self.extract(payload)[0]
+
+    def stats(self):
+        return {"shapes": len(self._shapes), "hits": self.hits, "misses": self.misses}
+
+
+# Native payload shapes of the platforms we integrate, tried after the flat fields
+PLATFORM_PATHS = (
+    ('telegram', 'message.text'),
+    ('telegram', 'edited_message.text'),
+    ('telegram', 'callback_query.data'),
+    ('messenger', 'entry.0.messaging.0.message.text'),
+    ('messenger', 'entry.0.messaging.0.postback.payload'),
+)
+
+# Field priority of each endpoint, as the handlers have always read them
+SEARCH_RULES = rules(
+    ('todook', 'shop'), ('generic', 'name'), ('generic', 'query'), ('generic', 'text'), ('generic', 'message'),
+    ('generic', 'user_input'), *PLATFORM_PATHS,
+)
+SEARCH_ARGS_RULES = rules(('todook', 'shop'), ('generic', 'name'), ('generic', 'query'))
+WEBHOOK_RULES = rules(
+    ('todook', 'shop'), ('generic', 'name'), ('generic', 'query'), ('generic', 'text'), ('generic', 'message'),
+    ('generic', 'user_input'), ('generic', 'user_message'), ('generic', 'content'), *PLATFORM_PATHS,
+)
+QUERY_RULES = rules(('generic', 'value'), *PLATFORM_PATHS)
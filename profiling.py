@@ -0,0 +1,202 @@
+"""
+On-demand cProfile runs of single requests.
+
+Off unless PROFILE_SECRET is set. A request carrying the same value in its
+X-Profile header then runs under cProfile, from the first before_request
+hook until the response has been serialized and compressed:
+
+    curl -H "X-Profile: $PROFILE_SECRET" "$HOST/assistant?question=where+to+park"
+
+The profile is written to the profile directory as a pstats file whose name
+sorts by duration (<microseconds>-<endpoint>-<pid>-<n>.prof), and only the
+slowest `keep` files are kept, across all workers. The response names its
+file in X-Profile-Id. The same secret reads them back:
+
+    GET /debug/profiles              slowest first, with durations
+    GET /debug/profiles/<name>       the raw .prof (load it with pstats or snakeviz)
+    GET /debug/profiles/<name>?text  the top functions by cumulative time
+
+or, on the box itself:
+
+    python profiling.py [list | show <name>] [--dir DIR]
+
+Only one request per worker is profiled at a time; another X-Profile
+request arriving meanwhile is served normally with X-Profile-Id: busy.
+"""
+
+import argparse
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+
+from flask import abort, g, jsonify, request, send_file
+
+from event_log import log_event
+
+HEADER = 'X-Profile'
+PROFILE_NAME = re.compile(r'^(\d{12})-([\w.]+)-(\d+)-(\d+)\.prof$')
+SEQUENCE = itertools.count()
+
+
+def default_directory():
+    return os.path.join(tempfile.gettempdir(), 'moa-profiles')
+
+
+def list_profiles(directory):
+    """[{name, duration_ms, endpoint, pid, saved_at}] in the directory, slowest first"""
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for name in os.listdir(directory):
+        match = PROFILE_NAME.match(name)
+        if match is None:
+            continue
+        try:
+            saved_at = os.path.getmtime(os.path.join(directory, name))
+        except OSError:
+            continue  # pruned by another worker
+        profiles.append({
+            "name": name,
+            "duration_ms": int(match.group(1)) / 1000,
+            "endpoint": match.group(2),
+            "pid": int(match.group(3)),
+            "saved_at": round(saved_at, 3),
+        })
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+
+def profile_text(path, limit=40):
+    """Top functions of a saved profile by cumulative time"""
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+class Profiler:
+    """Profiles requests that present the secret and keeps the slowest `keep` of them"""
+
+    def __init__(self, secret, directory=None, keep=20):
+        self.secret = secret
+        self.directory = directory or default_directory()
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def authorized(self):
+        presented = request.headers.get(HEADER, '')
+        return bool(presented) and hmac.compare_digest(presented.encode(), self.secret.encode())
+
+    def start(self):
+        if request.endpoint in (None, 'list_profiles', 'fetch_profile') or not self.authorized():
+            return
+        if not self._lock.acquire(blocking=False):
+            g.profile_id = 'busy'
+            return
+        g.profile = cProfile.Profile()
+        g.profile_start = time.perf_counter()
+        g.profile.enable()
+
+    def stop(self):
+        """Stop this request's profiler; returns it and the elapsed seconds, or None"""
+        profile = g.pop('profile', None)
+        if profile is None:
+            return None
+        profile.disable()
+        self._lock.release()
+        return profile, time.perf_counter() - g.profile_start
+
+    def save(self, profile, seconds):
+        """Write the profile if it is among the slowest `keep`; returns its name or None"""
+        name = (f"{min(int(seconds * 1_000_000), 10 ** 12 - 1):012d}-{request.endpoint}-"
+                f"{os.getpid()}-{next(SEQUENCE)}.prof")
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path)
+        for old in list_profiles(self.directory)[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, old["name"]))
+            except OSError:
+                pass
+        return name if os.path.exists(path) else None
+
+    def path(self, name):
+        if PROFILE_NAME.match(name) is None:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.exists(path) else None
+
+
+def install_profiling(app, secret, directory=None, keep=20):
+    """
+    Profile requests of app that send X-Profile: <secret>, and serve the
+    results under /debug/profiles. Does nothing without a secret. Install it
+    right after install_timing so its after_request hook runs after the
+    others (which are then part of the profile).
+    """
+    if not secret:
+        return None
+    profiler = Profiler(secret, directory, keep)
+
+    @app.before_request
+    def start_profile():
+        profiler.start()
+
+    @app.after_request
+    def save_profile(response):
+        stopped = profiler.stop()
+        if stopped is not None:
+            try:
+                g.profile_id = profiler.save(*stopped) or 'discarded'
+            except OSError as e:
+                log_event('profile_save_failed', directory=profiler.directory, error=str(e))
+                g.profile_id = 'failed'
+        if 'profile_id' in g:
+            response.headers['X-Profile-Id'] = g.profile_id
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc=None):
+        profiler.stop()  # the view raised before save_profile could run
+
+    def list_view():
+        if not profiler.authorized():
+            abort(404)
+        return jsonify({"directory": profiler.directory, "keep": profiler.keep,
+                        "profiles": list_profiles(profiler.directory)})
+
+    def fetch_view(name):
+        path = profiler.authorized() and profiler.path(name)
+        if not path:
+            abort(404)
+        if 'text' in request.args:
+            return profile_text(path), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
+
+    app.add_url_rule('/debug/profiles', 'list_profiles', list_view)
+    app.add_url_rule('/debug/profiles/<name>', 'fetch_profile', fetch_view)
+    return profiler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List or print saved request profiles")
+    parser.add_argument('command', nargs='?', default='list', choices=['list', 'show'])
+    parser.add_argument('name', nargs='?')
+    parser.add_argument('--dir', default=os.getenv('PROFILE_DIR') or default_directory())
+    parser.add_argument('--limit', type=int, default=40, help="functions to print with show")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        if not args.name:
+            parser.error("show needs a profile name (see list)")
+        print(profile_text(os.path.join(args.dir, args.name), args.limit))
+    else:
+        for profile in list_profiles(args.dir):
+            print(f"{profile['duration_ms']:10.3f} ms  {profile['endpoint']:<20} "
+                  f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(profile['saved_at']))}  {profile['name']}")
@@ -0,0 +1,126 @@
+"""
+Render layer for shop responses.
+
+Chatbot replies for a shop (the /search, /webhook and /query bodies), the
+/popular list and the /categories block only change when the catalog does,
+so they are formatted and JSON-encoded once per catalog version and served
+as ready-made bytes.
+"""
+
+from functools import lru_cache
+
+
+def shop_message(shop):
+    return f"🛍️ *{shop['name']}*\n\n📍 *Location:*\n{shop['location']}\n\n🏷️ *Category:* {shop['category']}"
+
+
+def fuzzy_message(shop):
+    """Shop message for a match that came from the fuzzy index"""
+    return f"🔎 Did you mean *{shop['name']}*?\n\n" + shop_message(shop)
+
+
+def not_found_message(shop_query, catalog):
+    return (f"Sorry, I couldn't find '{shop_query}' in {catalog.mall_name}. "
+            f"Try: {', '.join(catalog.search_hints)}")
+
+
+def category_line(shop):
+    """One shop entry in a /category listing"""
+    return f"• *{shop['name']}*\n  📍 {shop['location']}\n\n"
+
+
+def ndjson_chunks(pairs, dumps, chunk_lines=100):
+    """
+    NDJSON export of (key, shop) pairs - one {"key": ..., **shop} object per
+    line, yielded a chunk of lines at a time so nothing holds the whole list.
+    """
+    lines = []
+    for key, shop in pairs:
+        lines.append(dumps({"key": key, **shop}) + "\n")
+        if len(lines) == chunk_lines:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def popular_message(shops, mall_name):
+    message = f"⭐ *Popular Shops at {mall_name}:*\n\n"
+    for i, shop in enumerate(shops, 1):
+        message += f"{i}. *{shop['name']}*\n   📍 {shop['location']}\n   🏷️ {shop['category']}\n\n"
+    return message
+
+
+def categories_message(categories, mall_name):
+    message = f"📂 *Shop Categories at {mall_name}:*\n\n"
+    for i, cat in enumerate(categories, 1):
+        message += f"{i}. {cat}\n"
+    return message
+
+
+class RenderedCatalog:
+    """
+    Pre-rendered response bodies for one catalog snapshot.
+
+    dumps is the app's JSON encoder (compact app.json.dumps) so the bytes
+    are identical to what jsonify would have produced.
+
+    The /popular and /categories bodies are always built up front. Per-shop
+    bodies are built up front too when the whole shops dict is passed in
+    (in-memory catalogs); otherwise they are rendered on first use through
+    fetch(key) and kept in a bounded LRU (SQLite catalogs, which never load
+    every shop into the worker).
+    """
+
+    def __init__(self, dumps, mall_name, popular, categories, facets, shops=None, fetch=None,
+                 cache_size=4096):
+        self._dumps = dumps
+
+        if shops is not None:
+            self._entries = {key: self._render_entry(shop) for key, shop in shops.items()}
+            self._entry = self._entries.__getitem__
+        else:
+            self._fetch = fetch
+            self._entry = lru_cache(maxsize=cache_size)(self._fetch_entry)
+
+        message = popular_message(popular, mall_name)
+        self.popular = self.encode({"popular": popular, "count": len(popular), "message": message})
+        self.query_popular = self.encode({
+            "found": True,
+            "type": "popular",
+            "count": len(popular),
+            "shops": popular,
+            "message": message
+        })
+
+        message = categories_message(categories, mall_name)
+        self.categories = self.encode({"categories": categories, "facets": facets, "message": message})
+        self.query_categories = self.encode({
+            "found": True,
+            "type": "categories",
+            "categories": categories,
+            "message": message
+        })
+
+    def encode(self, payload):
+        """Serialize a payload the way jsonify does (trailing newline included)"""
+        return (self._dumps(payload) + "\n").encode()
+
+    def _render_entry(self, shop):
+        message = shop_message(shop)
+        return {
+            'search': self.encode({"found": True, "shop": shop, "message": message}),
+            'webhook': self.encode({"found": True, "shop": shop, "message": message, "text": message}),
+            'query': self.encode({"found": True, "type": "shop", "shop": shop, "message": message}),
+            'category_line': category_line(shop),
+        }
+
+    def _fetch_entry(self, key):
+        return self._render_entry(self._fetch(key))
+
+    def shop_body(self, kind, key):
+        """Encoded found-shop body for 'search', 'webhook' or 'query'"""
+        return self._entry(key)[kind]
+
+    def category_line(self, key):
+        return self._entry(key)['category_line']
@@ -0,0 +1,194 @@
+"""
+WSGI response cache for read-only routes.
+
+Chat platforms send the same few bodies ("parking rates", "history") to
+/traffic, /company and /assistant over and over. ResponseCache sits in front
+of the Flask app and answers repeats from memory, keyed on method, path,
+query string, a normalized body (JSON re-encoded with sorted keys, so
+spacing and key order don't matter) and the request headers that change the
+response (Accept-Encoding, Origin).
+
+    app.wsgi_app = ResponseCache(app.wsgi_app, routes={'/traffic': 300, '/company': 300})
+
+Only opted-in paths are cached, each with its own TTL; the cache is a bounded
+LRU. Concurrent identical misses are collapsed: the first request computes
+the response while the others wait for it (single flight). Only complete 200
+responses without Set-Cookie are stored; requests carrying any of
+bypass_headers (If-None-Match by default), and bodies of unknown length
+(chunked, or a POST without Content-Length), always go through to the app.
+A waiting request gives up after wait_timeout seconds and runs the app itself.
+Hits carry Server-Timing: cache;desc="hit" instead of the stored response's
+timings.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from compression import negotiate
+
+MAX_BODY_BYTES = 16 * 1024
+WAIT_TIMEOUT = 10.0
+
+
+def normalize_body(body):
+    """Canonical form of a request body: sorted compact JSON when it parses, else the raw bytes"""
+    if not body:
+        return b""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(',', ':')).encode()
+    except (ValueError, RecursionError):
+        return body
+
+
+class ResponseCache:
+    """WSGI middleware: LRU + TTL response cache with single-flight misses"""
+
+    def __init__(self, app, routes, max_entries=1024, clock=time.monotonic, bypass_headers=('If-None-Match',),
+                 wait_timeout=WAIT_TIMEOUT):
+        self.app = app
+        self.routes = dict(routes)
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.bypass_environ = tuple('HTTP_' + name.upper().replace('-', '_') for name in bypass_headers)
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires, status, headers, body)
+        self._inflight = {}            # key -> threading.Event
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0,
+                         "bypassed": 0, "wait_timeouts": 0}
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries), max_entries=self.max_entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _cache_key(self, environ):
+        """(key, body) for a cacheable request, or (None, None)"""
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '')
+        if path not in self.routes or method not in ('GET', 'POST'):
+            return None, None
+        if any(environ.get(name) for name in self.bypass_environ):
+            return None, None
+        # Only bodies of known length are read here; anything else the app reads itself
+        if environ.get('HTTP_TRANSFER_ENCODING') or (method == 'POST' and not environ.get('CONTENT_LENGTH')):
+            return None, None
+
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return None, None
+        if length > MAX_BODY_BYTES:
+            return None, None
+        body = environ['wsgi.input'].read(length) if length else b""
+        # Let the app read the body again
+        environ['wsgi.input'] = BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+
+        key = (method, path, environ.get('QUERY_STRING', ''), normalize_body(body),
+               negotiate(environ.get('HTTP_ACCEPT_ENCODING')), environ.get('HTTP_ORIGIN', ''))
+        return key, body
+
+    def _lookup(self, key):
+        """Fresh entry for key (marked most recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                self.counters["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry
+
+    def _store(self, key, ttl, status, headers, body):
+        # The miss's phase timings don't describe later hits
+        headers = [(name, value) for name, value in headers if name.lower() != 'server-timing']
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, status, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def _call_app(self, environ):
+        """Run the app and return (status, headers, body) fully read"""
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            return lambda data: captured.setdefault('written', []).append(data)
+
+        result = self.app(environ, start_response)
+        try:
+            body = b"".join(captured.get('written', [])) + b"".join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return captured['status'], captured['headers'], body
+
+    @staticmethod
+    def _cacheable(status, headers):
+        return status.startswith('200') and not any(name.lower() == 'set-cookie' for name, value in headers)
+
+    def _respond(self, start_response, status, headers, body, state):
+        headers = list(headers) + [('X-Cache', state)]
+        if state == 'HIT':
+            headers.append(('Server-Timing', 'cache;desc="hit"'))
+        start_response(status, headers)
+        return [body]
+
+    def __call__(self, environ, start_response):
+        key, body = self._cache_key(environ)
+        if key is None:
+            if environ.get('PATH_INFO', '') in self.routes:
+                self._count("bypassed")
+            return self.app(environ, start_response)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            expires, status, headers, cached_body = entry
+            return self._respond(start_response, status, headers, cached_body, 'HIT')
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = threading.Event()
+                self.counters["misses"] += 1
+            else:
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            # Wait for the identical request already running; if its response
+            # couldn't be cached (or it is stuck), compute our own
+            if not flight.wait(self.wait_timeout):
+                self._count("wait_timeouts")
+            entry = self._lookup(key)
+            if entry is not None:
+                expires, status, headers, cached_body = entry
+                return self._respond(start_response, status, headers, cached_body, 'HIT')
+            return self.app(environ, start_response)
+
+        try:
+            status, headers, response_body = self._call_app(environ)
+            if self._cacheable(status, headers):
+                self._store(key, self.routes[key[1]], status, headers, response_body)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.set()
+        return self._respond(start_response, status, headers, response_body, 'MISS')
@@ -0,0 +1,77 @@
+"""
+Inverted n-gram index for partial shop name lookups.
+
+Every shop key and lowercased display name is broken into all of its 1, 2
+and 3 character substrings, and each gram points at the shops containing it.
+A query of up to 3 characters is answered straight from one posting list;
+longer queries intersect the posting lists of their trigrams and only verify
+the (few) surviving candidates, so a lookup costs roughly the number of
+matching postings instead of the size of the catalog.
+"""
+
+GRAM_SIZE = 3
+
+
+def _grams(text):
+    """All distinct substrings of text with length 1..GRAM_SIZE"""
+    grams = set()
+    for size in range(1, GRAM_SIZE + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+
+class ShopIndex:
+    """Substring index over a shops dict ({key: {"name": ..., ...}})"""
+
+    def __init__(self, shops):
+        self.shops = shops
+        self._keys = list(shops.keys())
+        self._texts = []
+        postings = {}
+
+        for position, (key, shop_data) in enumerate(shops.items()):
+            name = shop_data["name"].lower()
+            self._texts.append((key, name))
+            for gram in _grams(key) | _grams(name):
+                postings.setdefault(gram, []).append(position)
+
+        # Positions are appended in catalog order, so every list is sorted
+        self._postings = {gram: tuple(positions) for gram, positions in postings.items()}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _candidates(self, query):
+        if len(query) <= GRAM_SIZE:
+            return self._postings.get(query, ())
+
+        trigrams = {query[i:i + GRAM_SIZE] for i in range(len(query) - GRAM_SIZE + 1)}
+        lists = []
+        for gram in trigrams:
+            positions = self._postings.get(gram)
+            if not positions:
+                return ()
+            lists.append(positions)
+
+        # Intersect starting from the rarest gram to keep the working set small
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for positions in lists[1:]:
+            candidates.intersection_update(positions)
+            if not candidates:
+                return ()
+
+        return [
+            position for position in sorted(candidates)
+            if query in self._texts[position][0] or query in self._texts[position][1]
+        ]
+
+    def search(self, query):
+        """
+        Return the keys whose key or lowercased name contains query,
+        in catalog order (the same order a linear scan of shops would give).
+        """
+        if not query:
+            return list(self._keys)
+        return [self._keys[position] for position in self._candidates(query)]
@@ -0,0 +1,223 @@
+"""
+SQLite catalog backend for directories too big to keep in every worker.
+
+The shops live in a local SQLite file with an FTS5 (trigram) index on key,
+name, category and location. SQLiteCatalog implements the same methods as the
+in-memory Catalog, so the Flask handlers serve either one unchanged. A mall
+is served from SQLite when its shard is a .db file (see malls.py):
+
+    malls/north.db                                      # /malls/north/...
+    CATALOG_FILE=moa.db gunicorn simple_app:app         # SM Mall of Asia
+
+Each worker thread opens one read-only connection on first use and keeps it.
+All SQL is fixed text, so sqlite3's per-connection statement cache prepares
+every statement only once.
+
+Build a database from MOA's shard file or any other .json/.csv shard:
+
+    python sqlite_catalog.py moa.db
+    python sqlite_catalog.py megamall.db megamall.json
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from catalog import catalog_version, read_shard
+from category_index import split_facets, split_terms
+from fuzzy_search import MAX_CANDIDATES, bounded_distance, compact, max_edits, trigrams, word_spans
+from render import RenderedCatalog
+
+SCHEMA = """
+CREATE TABLE meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE shops (
+    position INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX shops_by_category ON shops (category, position);
+CREATE VIRTUAL TABLE shops_fts USING fts5(
+    key, name, category, location,
+    content='', tokenize='trigram'
+);
+"""
+
+SELECT_META = "SELECT name, value FROM meta"
+SELECT_COUNT = "SELECT count(*) FROM shops"
+SELECT_CATEGORIES = "SELECT DISTINCT category FROM shops ORDER BY category"
+SELECT_SHOP = "SELECT data FROM shops WHERE key = ?"
+SELECT_ALL = "SELECT key, data FROM shops ORDER BY position"
+SELECT_BY_CATEGORY = "SELECT position, key, data FROM shops WHERE category = ? ORDER BY position"
+SELECT_BY_MATCH = (
+    "SELECT shops.position, shops.key, shops.data FROM shops_fts "
+    "JOIN shops ON shops.position = shops_fts.rowid "
+    "WHERE shops_fts MATCH ? ORDER BY shops.position"
+)
+SELECT_FUZZY_CANDIDATES = (
+    "SELECT shops.position, shops.key FROM shops_fts "
+    "JOIN shops ON shops.position = shops_fts.rowid "
+    "WHERE shops_fts MATCH ? ORDER BY rank LIMIT ?"
+)
+
+# Trigram FTS can only answer substrings of at least this many characters
+MIN_MATCH_LENGTH = 3
+
+
+def _phrase(text):
+    """FTS5 string literal for text"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_sqlite_catalog(path, shops, mall_name="SM Mall of Asia", popular=(), search_hints=()):
+    """Write shops to a new SQLite catalog at path (replaced atomically)"""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    with conn:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", [
+            ('version', catalog_version(shops, mall_name, popular, search_hints)),
+            ('mall_name', mall_name),
+            ('popular', json.dumps(list(popular))),
+            ('search_hints', json.dumps(list(search_hints))),
+        ])
+        for position, (key, shop) in enumerate(shops.items()):
+            conn.execute(
+                "INSERT INTO shops (position, key, category, data) VALUES (?, ?, ?, ?)",
+                (position, key, shop['category'], json.dumps(shop, ensure_ascii=False)),
+            )
+            conn.execute(
+                "INSERT INTO shops_fts (rowid, key, name, category, location) VALUES (?, ?, ?, ?, ?)",
+                # Keys are stored compacted and padded like FuzzyIndex does, so
+                # '^sm', 'smx', 'mx$' are all searchable trigrams
+                (position, f"^{compact(key)}$", shop['name'], shop['category'], shop.get('location', '')),
+            )
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+class SQLiteCatalog:
+    """Read-only catalog backed by a database from build_sqlite_catalog()"""
+
+    def __init__(self, path, dumps, cache_size=4096):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connection()
+        meta = dict(conn.execute(SELECT_META))
+        self.version = meta['version']
+        self.mall_name = meta['mall_name']
+        self.popular = tuple(json.loads(meta['popular']))
+        self.search_hints = tuple(json.loads(meta.get('search_hints', '[]'))) or self.popular[:5]
+        self._count = conn.execute(SELECT_COUNT).fetchone()[0]
+
+        # Distinct categories are few even for big malls, so keep them around
+        categories = [row[0] for row in conn.execute(SELECT_CATEGORIES)]
+        self._categories = [(category.lower(), category) for category in categories]
+        facets = sorted({facet for category in categories for facet in split_facets(category)})
+
+        popular_shops = [self.get(key) for key in self.popular]
+        self.rendered = RenderedCatalog(
+            dumps,
+            self.mall_name,
+            popular=[shop for shop in popular_shops if shop],
+            categories=categories,
+            facets=facets,
+            fetch=self.get,
+            cache_size=cache_size,
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.connection = conn
+        return conn
+
+    def __len__(self):
+        return self._count
+
+    def get(self, shop_key):
+        row = self._connection().execute(SELECT_SHOP, (shop_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_shop(self, shop_query):
+        """Same contract as Catalog.find_shop"""
+        if self.get(shop_query) is not None:
+            return shop_query, []
+
+        suggestions = self._suggest(shop_query)
+        if suggestions:
+            return suggestions[0], suggestions
+        return None, []
+
+    def _suggest(self, query, limit=5):
+        conn = self._connection()
+        best = {}
+        for span in word_spans(query):
+            allowed = max_edits(span)
+            match = 'key : (' + ' OR '.join(_phrase(gram) for gram in sorted(trigrams(span))) + ')'
+            for position, key in conn.execute(SELECT_FUZZY_CANDIDATES, (match, MAX_CANDIDATES)):
+                target = compact(key)
+                if abs(len(target) - len(span)) > allowed:
+                    continue
+                distance = bounded_distance(span, target, allowed)
+                if distance <= allowed and (distance, position) < best.get(key, (allowed + 1, 0)):
+                    best[key] = (distance, position)
+
+        return sorted(best, key=best.get)[:limit]
+
+    def _term_rows(self, term):
+        """(position, key, data) rows whose category contains term, in catalog order"""
+        conn = self._connection()
+        if len(term) >= MIN_MATCH_LENGTH:
+            return conn.execute(SELECT_BY_MATCH, ('category : ' + _phrase(term),)).fetchall()
+
+        rows = []
+        for lowered, category in self._categories:
+            if term in lowered:
+                rows.extend(conn.execute(SELECT_BY_CATEGORY, (category,)))
+        rows.sort()
+        return rows
+
+    def category_shops(self, query):
+        """Same contract as Catalog.category_shops"""
+        terms = split_terms(query)
+        if not terms:
+            return []
+
+        rows = self._term_rows(terms[0])
+        for term in terms[1:]:
+            if not rows:
+                break
+            keep = {row[0] for row in self._term_rows(term)}
+            rows = [row for row in rows if row[0] in keep]
+
+        return [(key, json.loads(data)) for position, key, data in rows]
+
+    def iter_shops(self, category=None):
+        """Same contract as Catalog.iter_shops; rows are read as they are consumed"""
+        if category:
+            return iter(self.category_shops(category))
+        return ((key, json.loads(data)) for key, data in self._connection().execute(SELECT_ALL))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print(__doc__)
+        sys.exit(1)
+
+    source = sys.argv[2] if len(sys.argv) == 3 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'malls', 'moa.json')
+    shard = read_shard(source)
+    build_sqlite_catalog(sys.argv[1], shard['shops'], mall_name=shard['name'],
+                         popular=shard['popular'], search_hints=shard['search_hints'])
+    print(f"✅ Wrote {len(shard['shops'])} shops to {sys.argv[1]}")
@@ -0,0 +1,126 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import requests
+
+from benchmarks.replay import replay, summarize
+from capture import Capture, read_capture
+
+# Two gunicorn workers appending to one capture file
+capture_file = os.path.join(tempfile.mkdtemp(), 'traffic.jsonl')
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+env = dict(os.environ, CAPTURE_FILE=capture_file, CATALOG_WATCH_SECONDS='0', METRICS_DIR=tempfile.mkdtemp())
+server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-w', '2', '-b', f'127.0.0.1:{port}', 'simple_app:app'],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+base = f"http://127.0.0.1:{port}"
+
+try:
+    for _ in range(100):
+        try:
+            requests.get(f"{base}/metrics", timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+
+    sent = 0
+    for i in range(20):
+        requests.get(f"{base}/search", params={"shop": "uniqlo"}, headers={"Connection": "close"})
+        requests.post(f"{base}/webhook", json={"text": "café mary grace", "n": i}, headers={"Connection": "close"})
+        requests.post(f"{base}/traffic", data='{"query": "parking rates"}', headers={"Content-Type": "text/plain"})
+        sent += 3
+    chunked = requests.post(f"{base}/traffic", data=iter([b'{"query": ', b'"parking rates"}']),
+                            headers={"Content-Type": "application/json"})
+    assert chunked.json()['type'] == 'parking_rates'
+    requests.post(f"{base}/webhook", data=b"\xff\xfe not utf-8", headers={"Content-Type": "application/octet-stream"})
+    sent += 1
+    requests.get(f"{base}/debug/memory")
+    sent += 1
+
+    records = read_capture(capture_file)
+    print(f"Test: {sent} requests sent -> {len(records)} captured, first {records[0]}")
+    assert len(records) == sent  # /metrics and /debug/ are not captured
+    webhook = next(entry for entry in records if entry['path'] == '/webhook' and 'body' in entry)
+    assert json.loads(webhook['body'])['text'] == "café mary grace" and webhook['content_type'] == 'application/json'
+    assert records[-1]['body_b64'] and records[1]['query'] == '' and records[0]['query'] == 'shop=uniqlo'
+    assert [entry['ts'] for entry in records] == sorted(entry['ts'] for entry in records)
+    assert records[-2]['body'] == '{"query": "parking rates"}'  # chunked, read to the end
+
+    # Back to back, 4 connections
+    start = time.perf_counter()
+    results = replay(records, base, speed=None, concurrency=4)
+    summary = summarize(results, time.perf_counter() - start)
+    print(f"Test: replay at max speed -> {summary['requests']} requests, {summary['throughput']} req/s, "
+          f"errors {summary['errors']}, 4xx {summary['client_errors']}, p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms")
+    assert summary['requests'] == sent and summary['errors'] == 0
+    assert summary['paths']['/search']['requests'] == 20 and summary['paths']['/traffic']['client_errors'] == 0
+
+    # On the captured schedule, squeezed 0.5 s of gaps into 0.1 s at 5x
+    spaced = [dict(entry, ts=1000 + i * 0.05) for i, entry in enumerate(records[:10])]
+    start = time.perf_counter()
+    results = replay(spaced, base, speed=5, concurrency=2)
+    elapsed = time.perf_counter() - start
+    print(f"Test: replay 10 requests spread over 0.45 s at 5x -> took {elapsed:.3f} s")
+    assert len(results) == 10 and 0.08 <= elapsed < 1.0
+
+    # Nothing listening: every request is an error
+    summary = summarize(replay(records[:3], 'http://127.0.0.1:9', speed=None, concurrency=1, timeout=1), 1)
+    print(f"Test: replay against a closed port -> error rate {summary['error_rate']}")
+    assert summary['error_rate'] == 1.0
+finally:
+    server.terminate()
+    server.wait()
+
+output = subprocess.run([sys.executable, 'benchmarks/replay.py', capture_file, '--target', 'http://127.0.0.1:9',
+                         '--speed', 'max', '--limit', '2', '--timeout', '1'], capture_output=True, text=True)
+print(f"Test: replay CLI with errors -> exit {output.returncode}")
+assert output.returncode == 1 and '2 requests' in output.stdout
+
+# A chunked body the server doesn't terminate is left to the app, and flagged
+def echo(environ, start_response):
+    start_response('200 OK', [])
+    return [environ['wsgi.input'].read()]
+
+
+unterminated = os.path.join(tempfile.mkdtemp(), 'chunked.jsonl')
+environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/webhook', 'HTTP_TRANSFER_ENCODING': 'chunked',
+           'wsgi.input': BytesIO(b'{"text": "muji"}')}
+assert b"".join(Capture(echo, unterminated)(environ, lambda status, headers: None)) == b'{"text": "muji"}'
+print(f"Test: unterminated chunked body -> {read_capture(unterminated)[0]}")
+assert read_capture(unterminated)[0]['body_truncated'] is True
+
+output = subprocess.run([sys.executable, 'benchmarks/replay.py', unterminated, '--target', 'http://127.0.0.1:9'],
+                        capture_output=True, text=True)
+print(f"Test: replay CLI on it -> {output.stdout.strip()!r}, exit {output.returncode}")
+assert 'Skipping 1 requests' in output.stdout and output.returncode != 0
+
+# Open loop: requests that wait for a busy connection count that wait as latency
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.1)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+slow = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+threading.Thread(target=slow.serve_forever, daemon=True).start()
+burst = [{"ts": 1000.0, "method": "GET", "path": "/slow"} for _ in range(5)]
+summary = summarize(replay(burst, f"http://127.0.0.1:{slow.server_address[1]}", speed=1, concurrency=1), 1)
+slow.shutdown()
+print(f"Test: 5 simultaneous requests, 1 connection, 100 ms each -> p50 {summary['p50_ms']} ms, "
+      f"max {summary['max_ms']} ms, most behind schedule {summary['max_late_ms']} ms")
+assert summary['max_ms'] >= 450 and summary['max_late_ms'] >= 350
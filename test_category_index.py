@@ -0,0 +1,33 @@
+from simple_app import app, DEFAULT_MALL, MALLS
+
+SHOPS = MALLS.get(DEFAULT_MALL).shops
+
+client = app.test_client()
+
+# Single terms must match the old linear scan exactly
+for term in ["food", "food & dining", "coffee", "restaurant", "apparel / fashion", "café", "nothing"]:
+    expected = [key for key, shop in SHOPS.items() if term in shop['category'].lower()]
+    assert MALLS.get(DEFAULT_MALL).category_index.shops_for(term) == expected, term
+
+# Facet browses and AND queries come from the postings built at load, with the same answers
+index = MALLS.get(DEFAULT_MALL).category_index
+assert 'coffee' in index._postings and 'food & dining' in index._postings
+for first in index.facets:
+    for second in ["food", "coffee", "fashion"]:
+        expected = [key for key, shop in SHOPS.items()
+                    if first in shop['category'].lower() and second in shop['category'].lower()]
+        assert index.shops_for(f"{first} and {second}") == expected, (first, second)
+
+response = client.get('/category', query_string={"name": "food AND coffee"})
+data = response.get_json()
+print(f"Test: GET /category 'food AND coffee' -> {response.status_code}")
+print(f"Shops: {[shop['name'] for shop in data['shops']]}")
+assert [shop['name'] for shop in data['shops']] == ["Starbucks"]
+
+response = client.get('/query', query_string={"type": "category", "value": "food + fast food"})
+print(f"Test: GET /query type=category 'food + fast food' -> {response.get_json()['count']} shops")
+assert response.get_json()['count'] == 2
+
+response = client.get('/categories')
+print(f"Test: GET /categories -> {len(response.get_json()['categories'])} categories, "
+      f"{len(response.get_json()['facets'])} facets")
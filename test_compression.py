@@ -0,0 +1,48 @@
+import gzip
+
+from compression import ENCODINGS, negotiate
+from simple_app import COMPRESS_MIN_BYTES, COMPRESSED, app
+
+client = app.test_client()
+
+for header, expected in [("gzip, deflate, br", ENCODINGS[0]), ("gzip;q=0.5, identity", "gzip"),
+                         ("deflate", None), ("*", ENCODINGS[0]), ("gzip;q=0", None), ("", None), (None, None)]:
+    print(f"Test: negotiate({header!r}) -> {negotiate(header)}")
+    assert negotiate(header) == expected
+
+# Canned answers: compressed once, then served from the cache
+for path, payload in [('/company', None), ('/assistant', {"question": "help"}), ('/categories', None)]:
+    plain = client.post(path, json=payload) if payload else client.get(path)
+    before = len(COMPRESSED)
+    for _ in range(3):
+        response = (client.post(path, json=payload, headers={"Accept-Encoding": "gzip"}) if payload else
+                    client.get(path, headers={"Accept-Encoding": "gzip"}))
+    print(f"Test: {path} gzip -> {len(plain.data)} -> {len(response.data)} bytes, cache +{len(COMPRESSED) - before}")
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert len(COMPRESSED) - before == 1
+
+# Per-request bodies are compressed but not cached
+before = len(COMPRESSED)
+response = client.post('/search/batch', json={"queries": ["uniqlo", "muji", "h&m", "jollibee"]},
+                       headers={"Accept-Encoding": "gzip"})
+print(f"Test: /search/batch gzip -> {response.headers.get('Content-Encoding')}, cache +{len(COMPRESSED) - before}")
+assert response.headers['Content-Encoding'] == 'gzip' and len(COMPRESSED) == before
+assert gzip.decompress(response.data) == client.post('/search/batch', json={"queries": ["uniqlo", "muji", "h&m", "jollibee"]}).data
+
+# Small bodies skip compression entirely
+response = client.get('/search', query_string={"shop": "uniqlo"}, headers={"Accept-Encoding": "gzip"})
+print(f"Test: /search ({len(response.data)} < {COMPRESS_MIN_BYTES} bytes) -> {response.headers.get('Content-Encoding')}")
+assert 'Content-Encoding' not in response.headers
+
+# Clients that don't ask get identity
+response = client.get('/company')
+print(f"Test: /company without Accept-Encoding -> {response.headers.get('Content-Encoding')}")
+assert 'Content-Encoding' not in response.headers and response.get_json()['type'] == 'complete'
+
+# Streams are left alone
+response = client.get('/shops/stream', headers={"Accept-Encoding": "gzip"}, buffered=False)
+print(f"Test: /shops/stream -> {response.headers.get('Content-Encoding')}")
+assert 'Content-Encoding' not in response.headers
+response.close()
@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import tempfile
+
+catalog_file = os.path.join(tempfile.mkdtemp(), 'moa.json')
+shutil.copy('malls/moa.json', catalog_file)
+os.environ['CATALOG_FILE'] = catalog_file
+os.environ['CATALOG_WATCH_SECONDS'] = '0'
+
+import simple_app
+from simple_app import CONTENT, DEFAULT_MALL, MALLS, app
+
+# simple_app may already have been imported (pytest collects every test_* module
+# first) with another CATALOG_FILE, so point MOA at this test's copy explicitly
+MALLS._files[DEFAULT_MALL] = catalog_file
+MALLS.get(DEFAULT_MALL)
+MALLS.reload(DEFAULT_MALL)
+assert MALLS._published[DEFAULT_MALL].path == catalog_file
+
+client = app.test_client()
+
+for path in ['/', '/categories', '/popular', '/traffic?category=parking_rates', '/company', '/about?category=history',
+             '/malls/moa/popular', '/assistant?question=parking']:
+    first = client.get(path)
+    etag = first.headers['ETag']
+    again = client.get(path, headers={"If-None-Match": etag})
+    print(f"Test: GET {path} -> {first.status_code} {etag} {first.headers['Cache-Control']}; revalidate -> {again.status_code}")
+    assert first.status_code == 200 and again.status_code == 304 and again.data == b""
+    assert again.headers['ETag'] == etag
+    assert client.get(path).headers['ETag'] == etag
+
+# Different inputs are different representations
+assert client.get('/traffic?category=parking_rates').headers['ETag'] != client.get('/traffic').headers['ETag']
+assert client.get('/traffic?category=parking_rates').get_json()['type'] == 'parking_rates'
+
+# A stale tag, or a POST, gets the full answer
+response = client.get('/categories', headers={"If-None-Match": '"nope"'})
+print(f"Test: stale If-None-Match -> {response.status_code}")
+assert response.status_code == 200
+response = client.post('/company', json={"category": "history"}, headers={"If-None-Match": "*"})
+print(f"Test: POST with If-None-Match: * -> {response.status_code}, ETag {response.headers.get('ETag')}")
+assert response.status_code == 200 and 'ETag' not in response.headers
+
+# The gzip variant has its own tag, and a client holding it gets a 304 too
+response = client.get('/categories', headers={"Accept-Encoding": "gzip"})
+print(f"Test: gzip /categories -> ETag {response.headers['ETag']}")
+assert response.headers['ETag'].endswith('-gzip"')
+again = client.get('/categories', headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers['ETag']})
+assert again.status_code == 304 and again.headers['ETag'] == response.headers['ETag']
+
+# 304s never run the handler (which would have built a json_response)
+calls = []
+json_response = simple_app.json_response
+simple_app.json_response = lambda *args, **kwargs: calls.append(args) or json_response(*args, **kwargs)
+etag = client.get('/categories').headers['ETag']
+company_etag = client.get('/company').headers['ETag']
+calls.clear()
+client.get('/categories', headers={"If-None-Match": etag})
+client.get('/company', headers={"If-None-Match": company_etag})
+print(f"Test: bodies built for the 304s -> {len(calls)}")
+assert len(calls) == 0
+simple_app.json_response = json_response
+
+# Editing the catalog changes the tags of catalog endpoints only
+old_categories = client.get('/categories').headers['ETag']
+old_company = client.get('/company').headers['ETag']
+with open(catalog_file, encoding='utf-8') as f:
+    shard = json.load(f)
+shard['shops']['uniqlo']['category'] = "Apparel / Basics"
+with open(catalog_file, 'w', encoding='utf-8') as f:
+    json.dump(shard, f)
+MALLS.reload()
+response = client.get('/categories', headers={"If-None-Match": old_categories})
+print(f"Test: after reload, old /categories tag -> {response.status_code}")
+assert response.status_code == 200 and response.headers['ETag'] != old_categories
+assert client.get('/company', headers={"If-None-Match": old_company}).status_code == 304
+print(f"Test: content version {CONTENT.version}, catalog version {MALLS.get(DEFAULT_MALL).version}")
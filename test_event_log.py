@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+log_dir = tempfile.mkdtemp()
+os.environ['LOG_FILE'] = os.path.join(log_dir, 'app-{pid}.jsonl')
+os.environ['ACCESS_LOG'] = '1'
+os.environ['METRICS_DIR'] = tempfile.mkdtemp()
+
+import event_log
+from event_log import EventLog
+from simple_app import app
+
+
+class SlowStream:
+    """stdout stand-in that takes 50 ms per write and counts them"""
+
+    def __init__(self):
+        self.writes = []
+        self.gate = threading.Event()
+
+    def write(self, data):
+        self.gate.wait()
+        time.sleep(0.05)
+        self.writes.append(data)
+
+    def flush(self):
+        pass
+
+
+# Callers never wait on the writer, and a full queue drops (and counts) instead of blocking
+stream = SlowStream()
+log = EventLog(max_queue=100, batch_size=50, stream=stream)
+start = time.perf_counter()
+for i in range(1000):
+    log('tick', i=i)
+elapsed = time.perf_counter() - start
+print(f"Test: 1000 events into a 100-slot queue behind a stalled writer -> {elapsed * 1000:.1f} ms, "
+      f"dropped {log.dropped}")
+assert elapsed < 0.5 and 890 <= log.dropped <= 900
+
+stream.gate.set()
+deadline = time.time() + 5
+while log.written < 1000 - log.dropped and time.time() < deadline:
+    time.sleep(0.05)
+lines = [json.loads(line) for chunk in stream.writes for line in chunk.splitlines()]
+dropped_events = [line for line in lines if line['event'] == 'log_dropped']
+print(f"Test: writer caught up -> {len(lines)} lines in {len(stream.writes)} writes, drop report {dropped_events}")
+assert len(stream.writes) <= 5  # batched, not one write per event
+assert dropped_events and dropped_events[0]['dropped_total'] == log.dropped
+assert [line['i'] for line in lines if line['event'] == 'tick'] == sorted(line['i'] for line in lines if line['event'] == 'tick')
+
+# Size-based rotation keeps `backups` old files
+path = os.path.join(tempfile.mkdtemp(), 'events.jsonl')
+log = EventLog(path=path, max_bytes=2000, backups=2, batch_size=10)
+for i in range(300):
+    log('filler', i=i, text="x" * 40)
+    if i % 10 == 9:
+        log.flush()
+log.flush()
+files = sorted(os.listdir(os.path.dirname(path)))
+print(f"Test: 300 events, 2000-byte files -> {files}, rotations {log.rotations}")
+assert files == ['events.jsonl', 'events.jsonl.1', 'events.jsonl.2'] and log.rotations > 2
+assert all(os.path.getsize(os.path.join(os.path.dirname(path), name)) <= 2000 for name in files)
+last = [json.loads(line) for line in open(path)]
+assert last[-1]['i'] == 299
+
+# The app's access log goes to LOG_FILE ({pid} expanded) through the process-wide log
+client = app.test_client()
+client.get('/search?shop=uniqlo')
+client.post('/webhook', json={"text": "nowhere"})
+event_log.LOG.flush()
+app_log = os.path.join(log_dir, f'app-{os.getpid()}.jsonl')
+requests_logged = [json.loads(line) for line in open(app_log) if '"event": "request"' in line]
+print(f"Test: access log -> {[(line['method'], line['path'], line['status']) for line in requests_logged]}")
+assert [(line['path'], line['status']) for line in requests_logged][-2:] == [('/search', 200), ('/webhook', 404)]
+assert 'search' in requests_logged[-2]['phases_ms']
+
+text = client.get('/metrics').get_data(as_text=True)
+print(f"Test: /metrics -> {[line for line in text.splitlines() if line.startswith('moa_log_')]}")
+assert 'moa_log_events_dropped_total 0' in text and 'moa_log_events_written_total' in text
@@ -0,0 +1,38 @@
+import random
+import string
+import time
+
+from fuzzy_search import FuzzyIndex
+from simple_app import app
+
+client = app.test_client()
+
+# Typos chat users actually send
+for query, expected in [("uniqlo store", "uniqlo"), ("shakeshack", "shake shack"),
+                        ("starbuks", "starbucks"), ("jolibee", "jollibee")]:
+    response = client.post('/search', json={"shop": query})
+    data = response.get_json()
+    print(f"Test: POST /search {query!r} -> {response.status_code} {data.get('did_you_mean')}")
+    assert response.status_code == 200 and data["did_you_mean"][0] == expected
+
+    response = client.get('/query', query_string={"type": "shop", "value": query})
+    assert response.status_code == 200 and response.get_json()["did_you_mean"][0] == expected
+
+response = client.post('/search', json={"shop": "xyz123"})
+print(f"Test: POST /search 'xyz123' -> {response.status_code}")
+assert response.status_code == 404
+
+# Sub-millisecond suggestions on a 10k-shop catalog
+random.seed(7)
+keys = [''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 10))) +
+        random.choice(['', ' store', ' cafe', ' express'])
+        for _ in range(10000)]
+index = FuzzyIndex(keys)
+queries = [key[:2] + key[3:] for key in random.sample(keys, 1000)]
+
+start = time.perf_counter()
+for query in queries:
+    index.suggest(query)
+elapsed = (time.perf_counter() - start) / len(queries)
+
+print(f"\nTest: FuzzyIndex.suggest on 10k keys: {elapsed * 1000:.3f} ms/query")
@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+
+# Serve MOA from a scratch copy of its shard file, with the watcher off so
+# the test decides when reloads happen
+catalog_file = os.path.join(tempfile.mkdtemp(), 'moa.json')
+shutil.copy('malls/moa.json', catalog_file)
+os.environ['CATALOG_FILE'] = catalog_file
+os.environ['CATALOG_WATCH_SECONDS'] = '0'
+
+from simple_app import DEFAULT_MALL, MALLS, app
+
+with open(catalog_file, encoding='utf-8') as f:
+    shard = json.load(f)
+
+
+def write_catalog(location):
+    """Rewrite the shard file with a new Uniqlo location (atomically, like an editor/deploy would)"""
+    shard['shops']['uniqlo']['location'] = location
+    tmp_path = catalog_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(shard, f)
+    os.replace(tmp_path, catalog_file)
+
+
+original_location = MALLS.get(DEFAULT_MALL).get('uniqlo')['location']
+original_version = MALLS.get(DEFAULT_MALL).version
+
+# Readers hammer /search while the catalog is swapped under them. Every
+# response must be complete, and its location must belong to the version
+# named in its X-Catalog-Version header.
+seen = {}
+errors = []
+stop = threading.Event()
+
+
+def reader():
+    client = app.test_client()
+    while not stop.is_set():
+        response = client.get('/search', query_string={"shop": "uniqlo"})
+        data = response.get_json()
+        if response.status_code != 200 or not data.get('found'):
+            errors.append(f"{response.status_code} {data}")
+            continue
+        version = response.headers['X-Catalog-Version']
+        location = data['shop']['location']
+        if seen.setdefault(version, location) != location:
+            errors.append(f"version {version} served both {seen[version]!r} and {location!r}")
+
+
+readers = [threading.Thread(target=reader) for _ in range(8)]
+for thread in readers:
+    thread.start()
+
+versions = [original_version]
+for generation in range(20):
+    write_catalog(f"Main Mall, Level {generation}")
+    assert MALLS.reload() == [DEFAULT_MALL]
+    versions.append(MALLS.get(DEFAULT_MALL).version)
+    time.sleep(0.01)
+
+stop.set()
+for thread in readers:
+    thread.join()
+
+print(f"Test: 8 readers across 20 reloads -> {len(seen)} versions seen, {len(errors)} errors")
+assert not errors, errors[:5]
+assert len(set(versions)) == 21
+assert MALLS.get(DEFAULT_MALL).get('uniqlo')['location'] == "Main Mall, Level 19"
+
+# Unchanged file -> nothing to do
+print(f"Test: reload with no changes -> {MALLS.reload()}")
+assert MALLS.reload() == []
+
+# A broken file never replaces a working catalog
+with open(catalog_file, 'w', encoding='utf-8') as f:
+    f.write('{"shops": ')
+version = MALLS.get(DEFAULT_MALL).version
+print(f"Test: reload of a truncated file -> {MALLS.reload()}")
+assert MALLS.get(DEFAULT_MALL).version == version
+
+# SIGHUP reloads in the background
+write_catalog(original_location)
+os.kill(os.getpid(), signal.SIGHUP)
+deadline = time.time() + 5
+while MALLS.get(DEFAULT_MALL).version == version and time.time() < deadline:
+    time.sleep(0.01)
+print(f"Test: SIGHUP -> version {MALLS.get(DEFAULT_MALL).version}")
+assert MALLS.get(DEFAULT_MALL).version == original_version
+
+client = app.test_client()
+response = client.get('/malls')
+print(f"Test: GET /malls versions -> {response.get_json()['versions']}")
+assert response.get_json()['versions'][DEFAULT_MALL] == original_version
+assert client.get('/').get_json()['catalog_version'] == original_version
@@ -0,0 +1,38 @@
+import random
+
+from content import ROUTING_RULES
+from intent_router import IntentRouter, KeywordAutomaton
+from simple_app import app
+
+# The automaton must find exactly the keywords a substring check finds
+keywords = ['he', 'she', 'his', 'hers', 'park', 'parking', 'how much', 'h&m', 'cr', 'car']
+automaton = KeywordAutomaton(keywords)
+random.seed(3)
+for _ in range(2000):
+    text = ''.join(random.choices('hersipakngcmow &u', k=random.randint(0, 20)))
+    expected = {i for i, keyword in enumerate(keywords) if keyword in text}
+    assert automaton.find(text) == expected, text
+
+router = IntentRouter(ROUTING_RULES)
+cases = [
+    ('traffic', "how much is parking", 'parking_rates'),
+    ('traffic', "where do i park", 'parking_locations'),
+    ('traffic', "parking", 'parking'),
+    ('traffic', "walk from the mrt", 'public_transport'),
+    ('traffic', "walking route", 'walking_directions'),
+    ('traffic', "my car", 'parking_suggestion'),
+    ('company', "when was it built", 'history'),
+    ('company', "hello", None),
+    ('assistant', "what time do you close", 'hours'),
+    ('assistant', "vikings restaurant", 'vikings'),
+    ('assistant', "fireworks show", 'fireworks'),
+    ('assistant', "wifi password", 'wifi'),
+]
+for domain, question, expected in cases:
+    print(f"Test: {domain} {question!r} -> {router.classify(domain, question)}")
+    assert router.classify(domain, question) == expected
+
+client = app.test_client()
+response = client.post('/assistant', json={"question": "where can I eat"})
+print(f"\nTest: POST /assistant 'where can I eat' -> {response.get_json()['type']}")
+assert response.get_json()['type'] == 'dining'
@@ -0,0 +1,38 @@
+import json
+
+from content import ASSISTANT, COMPANY, TRAFFIC
+from json_provider import FastJSONProvider, orjson
+from simple_app import DEFAULT_MALL, MALLS, app
+
+client = app.test_client()
+catalog = MALLS.get(DEFAULT_MALL)
+
+payloads = [*TRAFFIC.values(), *COMPANY.values(), *ASSISTANT.values(),
+            {"shops": catalog.shops}, {"n": 2 ** 70}, {1: "int key", 2: "b"}, {"empty": [], "none": None, "pi": 3.14}]
+
+fast = FastJSONProvider(app)
+stdlib = FastJSONProvider(app)
+stdlib.use_orjson = False
+
+# Both encoders must decode back to exactly the same text (emoji, dashes, ...)
+for payload in payloads:
+    expected = json.loads(json.dumps(payload))
+    for provider in (fast, stdlib):
+        encoded = provider.dumps(payload)
+        assert json.loads(encoded) == provider.loads(encoded.encode()) == expected, payload
+print(f"Test: {len(payloads)} payloads round-trip through both encoders (orjson installed: {orjson is not None})")
+
+response = client.get('/company')
+text = response.data.decode()
+print(f"Test: GET /company -> {len(response.data)} bytes, raw emoji: {'🏢' in text}")
+assert response.get_json() == COMPANY['complete']
+assert ('🏢' in text) == fast.use_orjson
+
+response = client.get('/search', query_string={"shop": "uniqlo"})
+print(f"Test: GET /search uniqlo location -> {response.get_json()['shop']['location']}")
+assert response.get_json()['shop'] == catalog.get('uniqlo')
+assert response.data.endswith(b"}\n")
+
+response = client.post('/search', data='{"shop": "muji", "x": NaN}', content_type='application/json')
+print(f"Test: POST body orjson rejects (NaN) -> {response.status_code}")
+assert response.get_json()['shop']['name'] == "MUJI"
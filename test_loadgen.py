@@ -0,0 +1,30 @@
+import asyncio
+import random
+from collections import Counter
+
+from benchmarks.loadgen import find_knee, free_port, popularity_order, run_stages, start_gunicorn, zipf_picker
+from catalog import read_shard
+
+shard = read_shard('malls/moa.json')
+keys = popularity_order(shard)
+pick = zipf_picker(keys, rng=random.Random(3))
+counts = Counter(pick() for _ in range(20000))
+print(f"Test: Zipf over {len(keys)} shops -> top 3 {counts.most_common(3)}")
+assert keys[:len(shard['popular'])] == shard['popular']
+assert counts[keys[0]] > counts[keys[1]] > counts[keys[5]] > counts[keys[-1]]
+
+rows = [{"users": 10, "throughput": 100, "error_rate": 0}, {"users": 20, "throughput": 195, "error_rate": 0},
+        {"users": 40, "throughput": 230, "error_rate": 0}, {"users": 80, "throughput": 235, "error_rate": 0}]
+print(f"Test: knee of {[row['throughput'] for row in rows]} -> {find_knee(rows)['users']} users")
+assert find_knee(rows)['users'] == 20 and find_knee(rows[:2]) is None
+
+port = free_port()
+server = start_gunicorn(1, port)
+try:
+    steps = asyncio.run(run_stages(f"http://127.0.0.1:{port}", [5, 20], duration=1, ramp=0.3, think=0.05, shard=shard))
+finally:
+    server.terminate()
+    server.wait()
+print(f"Test: 5 then 20 users against gunicorn -w 1 -> {steps}")
+assert [step['users'] for step in steps] == [5, 20]
+assert all(step['throughput'] > 0 and step['errors'] == 0 for step in steps)
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+
+# Point the app at a throwaway shard directory before it loads
+malls_dir = tempfile.mkdtemp()
+os.environ['MALLS_DIR'] = malls_dir
+
+from malls import MallRegistry
+from simple_app import DEFAULT_MALL, MALLS, app, encode_json
+from sqlite_catalog import build_sqlite_catalog
+
+with open(os.path.join(malls_dir, 'megamall.json'), 'w', encoding='utf-8') as f:
+    json.dump({
+        "name": "SM Megamall",
+        "popular": ["uniqlo"],
+        "shops": {
+            "uniqlo": {"name": "Uniqlo", "location": "Mega A, Level 2", "category": "Apparel / Fashion"},
+            "fully booked": {"name": "Fully Booked", "location": "Mega B, Level 4", "category": "Books"}
+        }
+    }, f)
+build_sqlite_catalog(os.path.join(malls_dir, 'moa-db.db'), MALLS.get(DEFAULT_MALL).shops, mall_name="MOA (SQLite)")
+
+client = app.test_client()
+
+print(f"Loaded before requests: {list(MALLS.loaded())}")
+assert list(MALLS.loaded()) == ['moa']
+
+response = client.get('/malls/megamall/search', query_string={"shop": "uniqlo"})
+print(f"Test: GET /malls/megamall/search uniqlo -> {response.get_json()['shop']['location']}")
+assert response.get_json()['shop']['location'] == "Mega A, Level 2"
+
+response = client.post('/search', json={"shop": "fully boked", "mall": "megamall"})
+print(f"Test: POST /search with mall field -> {response.get_json()['shop']['name']}")
+assert response.get_json()['shop']['name'] == "Fully Booked"
+
+response = client.post('/query', json={"type": "category", "value": "food", "mall": "moa-db"})
+print(f"Test: POST /query mall=moa-db category food -> {response.get_json()['count']} shops")
+assert response.get_json()['count'] == client.get('/query?type=category&value=food').get_json()['count']
+
+response = client.get('/search?shop=uniqlo&mall=nowhere')
+print(f"Test: unknown mall -> {response.status_code} {response.get_json()['malls']}")
+assert response.status_code == 404
+
+response = client.get('/malls')
+print(f"Test: GET /malls -> loaded {sorted(response.get_json()['loaded'])}")
+
+# Over budget, only pinned shards and the one just loaded survive
+registry = MallRegistry(malls_dir, encode_json, budget_bytes=1)
+registry.get('megamall')
+registry.get('moa-db')
+print(f"Test: 1-byte budget keeps {sorted(registry.loaded())}")
+assert sorted(registry.loaded()) == ['moa-db']
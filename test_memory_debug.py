@@ -0,0 +1,82 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+os.environ['MEMORY_DEBUG_SECRET'] = 'm3m'
+
+from simple_app import RESPONSE_CACHE, app
+
+client = app.test_client()
+secret = {"X-Debug-Secret": "m3m"}
+
+assert client.get('/debug/memory').status_code == 404
+assert client.get('/debug/memory', headers={"X-Debug-Secret": "nope"}).status_code == 404
+
+status = client.get('/debug/memory', headers=secret).get_json()
+print(f"Test: GET /debug/memory -> pid {status['pid']}, rss {status['rss_bytes']}, threads {status['threads']}")
+assert status['pid'] == os.getpid() and status['rss_bytes'] > 0 and not status['tracemalloc']['tracing']
+
+response = client.post('/debug/memory/snapshot', headers=secret, json={})
+print(f"Test: snapshot before tracing -> {response.status_code} {response.get_json()['error']}")
+assert response.status_code == 400
+
+response = client.post('/debug/memory/tracemalloc', headers=secret, json={"action": "start"})
+assert response.get_json()['tracing'] is True
+assert client.post('/debug/memory/snapshot', headers=secret, json={"name": "before"}).get_json()['snapshot'] == 'before'
+
+# Leak something from a known line, plus some real traffic
+leak = []
+for i in range(2000):
+    leak.append("x" * 200 + str(i))  # LEAK-SITE
+    if i % 100 == 0:
+        if RESPONSE_CACHE is not None:
+            RESPONSE_CACHE.clear()
+        client.get('/assistant', query_string={"question": f"parking {i}"})
+leak_line = next(number for number, line in enumerate(open(__file__), 1) if line.strip().endswith('# LEAK-SITE'))
+assert client.post('/debug/memory/snapshot', headers=secret, json={"name": "after"}).status_code == 200
+
+diff = client.get('/debug/memory/diff?from=before&to=after&limit=5', headers=secret).get_json()
+print(f"Test: diff before -> after, top site {diff['sites'][0]}")
+assert diff['sites'][0]['site'].endswith(f"test_memory_debug.py:{leak_line}")
+assert diff['sites'][0]['count_diff'] >= 2000 and diff['sites'][0]['size_diff_kib'] > 400
+
+top = client.get('/debug/memory/top?snapshot=after&limit=3', headers=secret).get_json()
+print(f"Test: top sites in 'after' -> {[site['site'] for site in top['sites']]}")
+assert len(top['sites']) == 3
+assert client.get('/debug/memory/top', headers=secret).get_json()['snapshot'] == 'now'
+assert client.get('/debug/memory/diff?from=missing', headers=secret).status_code == 400
+
+status = client.get('/debug/memory', headers=secret).get_json()
+print(f"Test: status while tracing -> {status['tracemalloc']}, snapshots {[s['name'] for s in status['snapshots']]}")
+assert [s['name'] for s in status['snapshots']] == ['before', 'after'] and status['tracemalloc']['traced_bytes'] > 0
+client.post('/debug/memory/tracemalloc', headers=secret, json={"action": "stop"})
+assert client.get('/debug/memory', headers=secret).get_json()['tracemalloc']['tracing'] is False
+# Snapshots outlive tracing
+assert client.get('/debug/memory/diff?from=before&to=after', headers=secret).status_code == 200
+
+# Under gunicorn every worker sees its siblings' RSS
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+env = dict(os.environ, CATALOG_WATCH_SECONDS='0', METRICS='0')
+server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-w', '2', '-b', f'127.0.0.1:{port}', 'simple_app:app'],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+try:
+    for _ in range(100):
+        try:
+            status = requests.get(f"http://127.0.0.1:{port}/debug/memory", headers=secret, timeout=1).json()
+            if len(status['workers']) == 2:
+                break
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    print(f"Test: gunicorn -w 2 /debug/memory -> worker {status['pid']}, workers {status['workers']}")
+    assert len(status['workers']) == 2 and status['pid'] in {int(pid) for pid in status['workers']}
+    assert all(rss > 0 for rss in status['workers'].values())
+finally:
+    server.terminate()
+    server.wait()
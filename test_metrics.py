@@ -0,0 +1,57 @@
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+# Three real gunicorn workers sharing one metrics directory
+metrics_dir = tempfile.mkdtemp()
+with socket.socket() as s:
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+
+env = dict(os.environ, METRICS_DIR=metrics_dir, METRICS_FLUSH_SECONDS='0.5', CATALOG_WATCH_SECONDS='0')
+server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-w', '3', '-b', f'127.0.0.1:{port}', 'simple_app:app'],
+                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+base = f"http://127.0.0.1:{port}"
+
+
+def total(text, endpoint, method, status):
+    match = re.search(rf'moa_http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} (\d+)', text)
+    return int(match.group(1)) if match else 0
+
+
+try:
+    for _ in range(100):
+        try:
+            requests.get(f"{base}/", timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+
+    # New connection per request, so the kernel spreads them over the workers
+    for i in range(60):
+        requests.get(f"{base}/search", params={"shop": "uniqlo"}, headers={"Connection": "close"})
+        requests.post(f"{base}/webhook", json={"shop": "nowhere"}, headers={"Connection": "close"})
+    time.sleep(1.5)
+
+    text = requests.get(f"{base}/metrics").text
+    workers = int(re.search(r'moa_workers_reporting (\d+)', text).group(1))
+    print(f"Test: /metrics sums {workers} worker(s): search 200 = {total(text, 'search', 'GET', '200')}, "
+          f"webhook 404 = {total(text, 'webhook', 'POST', '404')}")
+    assert total(text, 'search', 'GET', '200') == 60
+    assert total(text, 'webhook', 'POST', '404') == 60
+    assert 'moa_http_request_duration_seconds_bucket{endpoint="search",le="+Inf"} 60' in text
+    assert len(os.listdir(metrics_dir)) >= 2, os.listdir(metrics_dir)
+
+    # Every worker tells the same story
+    for _ in range(5):
+        assert total(requests.get(f"{base}/metrics", headers={"Connection": "close"}).text, 'search', 'GET', '200') == 60
+    print(f"Test: worker files -> {sorted(os.listdir(metrics_dir))}")
+finally:
+    server.terminate()
+    server.wait()
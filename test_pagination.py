@@ -0,0 +1,55 @@
+from pagination import encode_cursor, paginate
+from simple_app import app
+
+client = app.test_client()
+
+full = client.get('/category', query_string={"name": "food"}).get_json()
+print(f"Test: GET /category food (unpaged) -> {full['count']} shops, no cursor: {'next_cursor' not in full}")
+assert 'next_cursor' not in full and 'total' not in full
+
+# Walking the pages with limit=1 gives back the unpaged list
+shops, cursor, pages = [], None, 0
+while True:
+    response = client.get('/category', query_string={"name": "food", "limit": 1, "cursor": cursor or ''})
+    data = response.get_json()
+    assert response.status_code == 200 and data['count'] <= 1 and data['total'] == full['count']
+    shops += data['shops']
+    pages += 1
+    cursor = data['next_cursor']
+    if not cursor:
+        break
+print(f"Test: limit=1 pages through food in {pages} pages -> {len(shops)} shops")
+assert sorted(shop['name'] for shop in shops) == sorted(shop['name'] for shop in full['shops'])
+assert len(shops) == full['count']
+
+response = client.post('/category', json={"name": "food", "limit": 2, "fields": ["name", "location"]})
+data = response.get_json()
+print(f"Test: POST /category fields=name,location limit=2 -> {data['shops']}")
+assert data['count'] == 2 and all(set(shop) == {"name", "location"} for shop in data['shops'])
+assert data['message'].count('•') == 2
+
+response = client.get('/category', query_string={"name": "food", "fields": "price"})
+print(f"Test: unknown field -> {response.status_code} {response.get_json()['error']}")
+assert response.status_code == 400
+
+response = client.get('/category', query_string={"name": "food", "cursor": "garbage"})
+print(f"Test: bad cursor -> {response.status_code}")
+assert response.status_code == 400
+
+response = client.post('/category', json={"category": "food", "fields": 5})
+print(f"Test: fields=5 -> {response.status_code} {response.get_json()['error']}")
+assert response.status_code == 400
+
+# After a reload the next page starts after the same key, even if shops moved
+old = [("d", 4), ("a", 1), ("c", 3), ("b", 2)]
+page, cursor = paginate(old, "v1", limit=2)
+assert [key for key, value in page] == ["a", "b"]
+new = [("aa", 0), ("d", 4), ("c", 3), ("b", 2), ("a", 1)]
+page, cursor = paginate(new, "v2", cursor, limit=2)
+print(f"Test: page after shops were added and reordered -> {[key for key, value in page]}")
+assert [key for key, value in page] == ["c", "d"] and cursor is None
+
+# If the cursor's shop is gone, carry on with the next key: nothing skipped or repeated
+page, cursor = paginate([("x", 0), ("a", 1), ("c", 3), ("d", 4)], "v3", encode_cursor("v1", "b"), limit=2)
+print(f"Test: page after the cursor's shop was removed -> {[key for key, value in page]}")
+assert [key for key, value in page] == ["c", "d"] and cursor is not None
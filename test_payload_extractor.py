@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+os.environ['METRICS_DIR'] = tempfile.mkdtemp()
+
+from payload_extractor import SEARCH_RULES, WEBHOOK_RULES, PayloadExtractor, rules
+from simple_app import app
+
+TELEGRAM = {"update_id": 1, "message": {"message_id": 9, "chat": {"id": 7, "type": "private"}, "text": "Uniqlo"}}
+MESSENGER = {"object": "page", "entry": [{"id": "1", "time": 1, "messaging": [
+    {"sender": {"id": "2"}, "recipient": {"id": "1"}, "message": {"mid": "m", "text": "muji"}}]}]}
+TODOOK = {"shop": "h&m"}
+
+# Each platform's native shape resolves to its text
+extractor = PayloadExtractor(WEBHOOK_RULES)
+for payload, expected in [(TELEGRAM, ('Uniqlo', 'telegram')), (MESSENGER, ('muji', 'messenger')),
+                          (TODOOK, ('h&m', 'todook')), ({"user_message": "zara"}, ('zara', 'generic')),
+                          ({"text": 42}, ('42', 'generic')), ({"message": {"chat": {}}}, ('', None)),
+                          ([], ('', None)), ({}, ('', None))]:
+    result = extractor.extract(payload)
+    print(f"Test: {str(payload)[:60]} -> {result}")
+    assert result == expected
+
+# Flat fields keep their priority over nested ones; empty values are skipped
+assert extractor.extract({"text": "", "name": "  ", "message": {"text": "muji"}}) == ('  ', 'generic')
+assert extractor.extract({"text": "", "message": {"text": "muji"}}) == ('muji', 'telegram')
+
+# The rule search runs once per payload shape; same shape, different text -> cache hit
+extractor = PayloadExtractor(SEARCH_RULES)
+for text in ["uniqlo", "muji", "h&m", "zara"]:
+    payload = {"update_id": 2, "message": {"message_id": 3, "chat": {"id": 7}, "text": text}}
+    assert extractor.text(payload) == text
+print(f"Test: 4 Telegram updates -> {extractor.stats()}")
+assert extractor.stats() == {"shapes": 1, "hits": 3, "misses": 1}
+
+# Values are checked on every call, so a cached key set never hides a better match
+assert extractor.text({"shop": "", "name": "muji"}) == 'muji'
+assert extractor.text({"shop": "uniqlo", "name": "muji"}) == 'uniqlo'
+assert extractor.text({"shop": "", "name": ""}) == ''
+
+# '*' falls back to the first string anywhere, in payload order; numbers and booleans are skipped
+anything = PayloadExtractor(rules(('generic', 'name'), ('generic', '*')))
+assert anything.text({"foo": "", "bar": {"x": 1}, "baz": "starbucks", "qux": "zara"}) == 'starbucks'
+assert anything.text({"name": "muji", "baz": "starbucks"}) == 'muji'
+assert anything.text({"user_id": 12345, "shop": "uniqlo"}) == 'uniqlo'
+assert anything.text({"ok": True, "q": "muji"}) == 'muji'
+assert anything.text({"user_id": 12345, "shop": "zara"}) == 'zara'  # same shape, cached path
+assert anything.text({"ok": True, "n": 0}) == ''
+
+# Payloads with many keys, or very long ones, are searched without being cached
+extractor = PayloadExtractor(WEBHOOK_RULES)
+for i in range(50):
+    assert extractor.text(dict({f"junk{i}-{j}": "x" for j in range(200)}, shop="uniqlo")) == 'uniqlo'
+assert extractor.text({"k" * 10000: "x", "shop": "muji"}) == 'muji'
+print(f"Test: 50 payloads of 200 junk keys, one 10,000-char key -> {extractor.stats()}")
+assert extractor.stats()["shapes"] == 0
+
+# A full cache starts over instead of growing without bound
+small = PayloadExtractor(rules(('generic', '*')), max_shapes=4)
+for i in range(10):
+    assert small.text({f"field{i}": "x"}) == 'x'
+assert small.stats()["shapes"] <= 4
+
+# The endpoints answer platform payloads directly
+client = app.test_client()
+for path, payload in [('/webhook', TELEGRAM), ('/webhook', MESSENGER), ('/search', TELEGRAM), ('/search', TODOOK)]:
+    response = client.post(path, json=payload)
+    data = response.get_json()
+    print(f"Test: POST {path} {list(payload)} -> {response.status_code} {data['shop']['name']}")
+    assert response.status_code == 200 and data['found']
+
+response = client.post('/query', json={"type": "shop", "message": {"chat": {"id": 1}, "text": "uniqlo"}})
+assert response.status_code == 200 and response.get_json()['found']
+
+# Bodies that aren't JSON objects get the usual 400, not a 500
+for path in ['/search', '/query', '/webhook']:
+    for body in ['["uniqlo"]', '42', '"uniqlo"', 'not json']:
+        response = client.post(path, data=body, content_type='application/json')
+        print(f"Test: POST {path} {body!r} -> {response.status_code}")
+        assert response.status_code == 400
+
+stats = client.get('/cache/stats').get_json()['payload_shapes']
+print(f"Test: /cache/stats payload_shapes -> {stats}")
+assert stats['webhook']['misses'] >= 2
@@ -0,0 +1,81 @@
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+
+profile_dir = tempfile.mkdtemp()
+os.environ['PROFILE_SECRET'] = 's3cret'
+os.environ['PROFILE_DIR'] = profile_dir
+os.environ['PROFILE_KEEP'] = '3'
+
+from flask import Flask
+
+from profiling import install_profiling
+from simple_app import app
+
+client = app.test_client()
+secret = {"X-Profile": "s3cret"}
+
+# Without the secret nothing is profiled and the listing doesn't exist
+response = client.get('/assistant?question=parking')
+print(f"Test: no header -> X-Profile-Id {response.headers.get('X-Profile-Id')}")
+assert 'X-Profile-Id' not in response.headers and os.listdir(profile_dir) == []
+assert client.get('/assistant?question=parking', headers={"X-Profile": "wrong"}).headers.get('X-Profile-Id') is None
+assert client.get('/debug/profiles').status_code == 404
+
+# Profiled requests skip the response cache, so the view itself is measured
+names = []
+for path in ['/assistant?question=parking', '/assistant?question=parking', '/category?name=food',
+             '/query?type=category&value=dining', '/search?shop=uniqlp']:
+    response = client.get(path, headers=secret)
+    print(f"Test: GET {path} profiled -> {response.headers['X-Profile-Id']} (X-Cache {response.headers.get('X-Cache')})")
+    assert response.status_code == 200 and response.headers.get('X-Cache') is None
+    names.append(response.headers['X-Profile-Id'])
+
+listing = client.get('/debug/profiles', headers=secret).get_json()
+durations = [profile['duration_ms'] for profile in listing['profiles']]
+print(f"Test: /debug/profiles -> {[(p['endpoint'], p['duration_ms']) for p in listing['profiles']]}")
+assert len(listing['profiles']) == 3 and durations == sorted(durations, reverse=True)
+assert len(os.listdir(profile_dir)) == 3
+
+name = listing['profiles'][0]['name']
+raw = client.get(f'/debug/profiles/{name}', headers=secret)
+path = os.path.join(tempfile.mkdtemp(), name)
+with open(path, 'wb') as f:
+    f.write(raw.data)
+stats = pstats.Stats(path)
+print(f"Test: fetch {name} -> {len(raw.data)} bytes, {stats.total_calls} calls")
+assert raw.status_code == 200 and stats.total_calls > 0
+text = client.get(f'/debug/profiles/{name}?text', headers=secret).get_data(as_text=True)
+assert 'cumulative' in text and 'function calls' in text
+assert client.get('/debug/profiles/../../etc/passwd', headers=secret).status_code == 404
+assert client.get(f'/debug/profiles/{name}').status_code == 404
+
+# The CLI reads the same directory
+output = subprocess.run([sys.executable, 'profiling.py', 'list', '--dir', profile_dir],
+                        capture_output=True, text=True, check=True).stdout
+print(f"Test: python profiling.py list ->\n{output}")
+assert output.count('.prof') == 3
+
+# A view that raises still releases the profiler
+failing = Flask(__name__)
+profiler = install_profiling(failing, 's3cret', directory=profile_dir, keep=3)
+
+
+@failing.route('/boom')
+def boom():
+    raise RuntimeError("boom")
+
+
+@failing.route('/ok')
+def ok():
+    return "ok"
+
+
+failing.config['PROPAGATE_EXCEPTIONS'] = False
+failing_client = failing.test_client()
+assert failing_client.get('/boom', headers=secret).status_code == 500
+response = failing_client.get('/ok', headers=secret)
+print(f"Test: after a failing view -> next request {response.headers['X-Profile-Id']}, locked {profiler._lock.locked()}")
+assert response.headers['X-Profile-Id'] != 'busy' and not profiler._lock.locked()
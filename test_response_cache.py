@@ -0,0 +1,93 @@
+import threading
+import time
+from io import BytesIO
+
+from response_cache import ResponseCache
+from simple_app import RESPONSE_CACHE, app
+
+client = app.test_client()
+RESPONSE_CACHE.clear()
+
+first = client.post('/traffic', json={"query": "parking rates"})
+again = client.post('/traffic', data='{ "query" :  "parking rates" }', content_type='application/json')
+print(f"Test: POST /traffic twice -> {first.headers['X-Cache']}, {again.headers['X-Cache']} (body spacing ignored)")
+assert first.headers['X-Cache'] == 'MISS' and again.headers['X-Cache'] == 'HIT'
+assert again.data == first.data and again.get_json()['type'] == 'parking_rates'
+
+other = client.post('/traffic', json={"query": "how to get there by mrt"})
+print(f"Test: different body -> {other.headers['X-Cache']} {other.get_json()['type']}")
+assert other.headers['X-Cache'] == 'MISS' and other.data != first.data
+
+client.post('/company', json={})
+zipped = client.post('/company', json={}, headers={"Accept-Encoding": "gzip"})
+print(f"Test: POST /company again, gzip accepted -> {zipped.headers['X-Cache']} {zipped.headers.get('Content-Encoding')}")
+assert zipped.headers['X-Cache'] == 'MISS' and zipped.headers['Content-Encoding'] == 'gzip'
+
+# Routes that didn't opt in never see the cache
+response = client.get('/search', query_string={"shop": "uniqlo"})
+print(f"Test: /search -> X-Cache {response.headers.get('X-Cache')}")
+assert 'X-Cache' not in response.headers
+
+response = client.get('/cache/stats')
+print(f"Test: GET /cache/stats -> {response.get_json()['response_cache']}")
+assert response.get_json()['response_cache']['hits'] >= 1
+
+
+# Single flight, TTL and LRU on a slow stand-in app
+calls = []
+
+
+def slow_app(environ, start_response):
+    calls.append(environ['PATH_INFO'])
+    time.sleep(0.2)
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [environ['wsgi.input'].read()]
+
+
+now = [0.0]
+cache = ResponseCache(slow_app, routes={'/a': 10, '/b': 10}, max_entries=2, clock=lambda: now[0])
+
+
+def call(path, body=b'{"q": 1}'):
+    environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': path, 'CONTENT_LENGTH': str(len(body)),
+               'wsgi.input': BytesIO(body)}
+    return b"".join(cache(environ, lambda status, headers: None))
+
+
+threads = [threading.Thread(target=call, args=('/a',)) for _ in range(10)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Test: 10 concurrent identical misses -> app ran {len(calls)}x, {cache.stats()}")
+assert len(calls) == 1 and cache.stats()['coalesced'] == 9
+assert call('/a', b'{"q":1}') == b'{"q": 1}'
+
+now[0] = 11
+call('/a')
+print(f"Test: after TTL -> app ran {len(calls)}x, expired {cache.stats()['expired']}")
+assert len(calls) == 2 and cache.stats()['expired'] == 1
+
+call('/b')
+call('/b', b'{"q": 2}')
+print(f"Test: 3 keys in a 2-entry cache -> evictions {cache.stats()['evictions']}")
+assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+
+# Bodies of unknown length go straight to the app instead of being cached as empty
+bypassed = cache.stats()['bypassed']
+environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/b', 'HTTP_TRANSFER_ENCODING': 'chunked',
+           'wsgi.input': BytesIO(b'{"q": 3}'), 'wsgi.input_terminated': True}
+body = b"".join(cache(environ, lambda status, headers: None))
+print(f"Test: chunked POST -> {body!r}, bypassed {cache.stats()['bypassed'] - bypassed}")
+assert body == b'{"q": 3}' and cache.stats()['bypassed'] == bypassed + 1
+
+deep = b'[' * 8000 + b']' * 8000  # under MAX_BODY_BYTES, too deep for json
+assert call('/a', deep) == deep
+
+# A stuck leader doesn't hold identical requests forever
+stuck = ResponseCache(slow_app, routes={'/a': 10}, wait_timeout=0.05)
+stuck._inflight[('POST', '/a', '', b'{"q":1}', None, '')] = threading.Event()
+environ = {'REQUEST_METHOD': 'POST', 'PATH_INFO': '/a', 'CONTENT_LENGTH': '8', 'wsgi.input': BytesIO(b'{"q": 1}')}
+body = b"".join(stuck(environ, lambda status, headers: None))
+print(f"Test: leader never finishes -> follower answered {body!r}, {stuck.stats()['wait_timeouts']} wait timeout")
+assert body == b'{"q": 1}' and stuck.stats()['wait_timeouts'] == 1
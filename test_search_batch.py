@@ -0,0 +1,42 @@
+import json
+
+from simple_app import SEARCH_BATCH_MAX, app
+
+client = app.test_client()
+
+queries = ["uniqlo", "muji", "watsons", "starbucks", "uniqloo", "nowhere"]
+
+response = client.post('/search/batch', json={"queries": queries})
+data = json.loads(response.data)
+print(f"Test: POST /search/batch {queries} -> {response.status_code}, found {data['found']}/{data['count']}")
+assert response.status_code == 200
+assert data['queries'] == queries
+assert data['count'] == len(queries)
+
+# Every item is exactly what /search says for that name
+for query, result in zip(queries, data['results']):
+    single = client.get('/search', query_string={"shop": query})
+    assert result == single.get_json(), query
+    assert result['found'] == (single.status_code == 200)
+    print(f"  {query!r}: found={result['found']} {result.get('shop', {}).get('name', '')}")
+assert data['found'] == sum(result['found'] for result in data['results'])
+
+response = client.get('/search/batch', query_string={"shops": "Uniqlo, muji ,"})
+print(f"Test: GET /search/batch?shops=Uniqlo, muji , -> {response.get_json()['queries']}")
+assert response.get_json()['queries'] == ["uniqlo", "muji"]
+
+response = client.post('/search/batch', json={"shops": "uniqlo, h&m", "mall": "moa"})
+print(f"Test: POST comma-separated string -> found {response.get_json()['found']}")
+assert response.get_json()['found'] == 2
+
+response = client.post('/search/batch', json={"queries": ["muji"] * (SEARCH_BATCH_MAX + 1)})
+print(f"Test: {SEARCH_BATCH_MAX + 1} names -> {response.status_code} {response.get_json()['error']}")
+assert response.status_code == 400
+
+response = client.post('/search/batch', json={"queries": {"not": "a list"}})
+print(f"Test: non-list queries -> {response.status_code}")
+assert response.status_code == 400
+
+response = client.post('/search/batch', json={})
+print(f"Test: empty batch -> {response.status_code}")
+assert response.status_code == 400
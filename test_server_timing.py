@@ -0,0 +1,59 @@
+from flask import Flask
+
+from simple_app import RESPONSE_CACHE, app
+from timing import install_timing, mark
+
+
+def phases(response):
+    """{phase: ms} from a Server-Timing header"""
+    timings = {}
+    for entry in response.headers['Server-Timing'].split(', '):
+        name, _, duration = entry.partition(';dur=')
+        timings[name] = float(duration)
+    return timings
+
+
+client = app.test_client()
+
+for method, path, kwargs, expected in [
+    ('POST', '/search', {"json": {"shop": "uniqlo"}}, ['parse', 'extract', 'search', 'serialize']),
+    ('POST', '/search', {"json": {"shop": "uniqlp"}}, ['parse', 'extract', 'search', 'render', 'serialize']),
+    ('GET', '/search?shop=zzzz', {}, ['extract', 'search', 'render', 'serialize']),
+    ('POST', '/webhook', {"json": {"text": "uniqlo"}}, ['parse', 'extract', 'search', 'serialize']),
+    ('GET', '/query?type=category&value=food', {}, ['extract', 'search', 'render', 'serialize']),
+    ('GET', '/category?name=food', {"headers": {"Accept-Encoding": "gzip"}}, ['extract', 'search', 'render', 'serialize', 'compress']),
+    ('GET', '/search/batch?shops=uniqlo,muji', {}, ['extract', 'search', 'serialize']),
+    ('GET', '/assistant?question=parking', {}, ['parse', 'extract', 'search', 'serialize']),
+]:
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.clear()
+    response = client.open(path, method=method, **kwargs)
+    timings = phases(response)
+    print(f"Test: {method} {path} -> {response.status_code} {response.headers['Server-Timing']}")
+    assert list(timings)[:-1] == expected, timings
+    assert list(timings)[-1] == 'total' and timings['total'] >= sum(list(timings.values())[:-1]) - 0.01
+
+# A cached answer reports the cache instead of the timings of the request that filled it
+if RESPONSE_CACHE is not None:
+    client.get('/traffic?category=parking_rates')
+    response = client.get('/traffic?category=parking_rates')
+    print(f"Test: cached /traffic -> {response.headers['X-Cache']} {response.headers['Server-Timing']}")
+    assert response.headers['X-Cache'] == 'HIT' and response.headers['Server-Timing'] == 'cache;desc="hit"'
+
+# Structured 'request' event
+logged = Flask(__name__)
+events = []
+install_timing(logged, log=lambda event, **fields: events.append(dict(fields, event=event)))
+
+
+@logged.route('/slow')
+def slow():
+    mark('parse')
+    return "ok"
+
+
+response = logged.test_client().get('/slow')
+print(f"Test: request event -> {events}")
+assert len(events) == 1 and events[0]['event'] == 'request' and events[0]['endpoint'] == 'slow'
+assert events[0]['status'] == 200 and events[0]['bytes'] == 2
+assert list(events[0]['phases_ms']) == ['parse', 'serialize'] and 'total;dur=' in response.headers['Server-Timing']
@@ -0,0 +1,36 @@
+import json
+import os
+import tempfile
+
+from simple_app import DEFAULT_MALL, MALLS, app, encode_json
+from sqlite_catalog import SQLiteCatalog, build_sqlite_catalog
+
+client = app.test_client()
+catalog = MALLS.get(DEFAULT_MALL)
+
+response = client.get('/shops/stream', buffered=False)
+streamed = response.is_streamed
+lines = response.data.decode().splitlines()
+print(f"Test: GET /shops/stream -> {response.status_code} {response.mimetype}, {len(lines)} lines, streamed={streamed}")
+assert response.mimetype == 'application/x-ndjson'
+assert streamed
+assert len(lines) == len(catalog)
+rows = [json.loads(line) for line in lines]
+assert [row['key'] for row in rows] == list(catalog.shops)
+assert all({**catalog.get(row['key']), "key": row['key']} == row for row in rows)
+
+# Same matching as /category
+for name in ["food", "Food & Dining", "food and coffee", "nothing"]:
+    response = client.get('/shops/stream', query_string={"category": name})
+    keys = [json.loads(line)['key'] for line in response.data.decode().splitlines()]
+    expected = [key for key, shop in catalog.category_shops(name)]
+    print(f"Test: GET /shops/stream?category={name} -> {len(keys)} shops")
+    assert keys == expected
+
+# SQLite shards stream straight off a cursor, in the same order
+db_path = os.path.join(tempfile.mkdtemp(), 'moa.db')
+build_sqlite_catalog(db_path, catalog.shops)
+sqlite = SQLiteCatalog(db_path, encode_json)
+print(f"Test: SQLite iter_shops matches in-memory -> {list(sqlite.iter_shops()) == list(catalog.iter_shops())}")
+assert list(sqlite.iter_shops()) == list(catalog.iter_shops())
+assert list(sqlite.iter_shops('coffee')) == list(catalog.iter_shops('coffee'))
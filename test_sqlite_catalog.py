@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+from catalog import Catalog, read_shard
+from simple_app import encode_json
+from sqlite_catalog import SQLiteCatalog, build_sqlite_catalog
+
+db_path = os.path.join(tempfile.mkdtemp(), 'moa.db')
+shard = read_shard('malls/moa.json')
+SHOPS = shard['shops']
+build_sqlite_catalog(db_path, SHOPS, popular=shard['popular'])
+
+memory = Catalog(SHOPS, encode_json, popular=shard['popular'])
+sqlite = SQLiteCatalog(db_path, encode_json)
+
+print(f"Test: SQLite catalog {db_path} ({len(sqlite)} shops, version {sqlite.version})")
+assert len(sqlite) == len(memory) and sqlite.version == memory.version
+
+# Both backends must give the handlers exactly the same answers
+assert sqlite.rendered.popular == memory.rendered.popular
+assert sqlite.rendered.categories == memory.rendered.categories
+for key in SHOPS:
+    assert sqlite.get(key) == memory.get(key)
+    assert sqlite.rendered.shop_body('webhook', key) == memory.rendered.shop_body('webhook', key)
+
+for query in ["starbuks", "shakeshack", "uniqlo store", "jolibee", "powr mac", "the sm stor", "xyz123"]:
+    assert sqlite.find_shop(query) == memory.find_shop(query), query
+
+for query in ["food", "fo", "café", "restaurant", "apparel / fashion", "food and coffee", "x"]:
+    assert sqlite.category_shops(query) == memory.category_shops(query), query
+
+print("✅ SQLite and in-memory catalogs agree")
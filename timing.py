@@ -0,0 +1,84 @@
+"""
+Per-request phase timers, reported in a Server-Timing header.
+
+Handlers mark the end of each phase as they go; a phase's duration is the
+time since the previous mark, and marking a phase twice adds up:
+
+    data = request.get_json(force=True, silent=True) or {}
+    mark('parse')
+    shop_query = ...
+    mark('extract')
+
+The 'serialize' phase ends when the response leaves the view (the first
+after_request hook marks it) and 'compress' after the body is compressed.
+Browsers' dev tools and curl -v show the result:
+
+    Server-Timing: parse;dur=0.021, extract;dur=0.004, search;dur=0.188, serialize;dur=0.035, total;dur=0.262
+
+With a log function (event_log.log_event) every request is also logged as a
+'request' event with the same numbers.
+"""
+
+import time
+
+from flask import g, request
+
+
+class PhaseTimer:
+    """Accumulated seconds per phase for one request"""
+
+    __slots__ = ('start', 'last', 'phases')
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.phases = {}
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def header(self):
+        parts = [f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in self.phases.items()]
+        parts.append(f"total;dur={self.total() * 1000:.3f}")
+        return ", ".join(parts)
+
+
+def mark(phase):
+    """End phase for the current request (no-op outside one)"""
+    timer = g.get('phase_timer')
+    if timer is not None:
+        timer.mark(phase)
+
+
+def install_timing(app, log=None):
+    """
+    Time every request of app. Call this before registering other
+    after_request hooks: Flask runs them in reverse, so the header is then
+    written after all of them (compression included) have run.
+    """
+    @app.before_request
+    def start_phase_timer():
+        g.phase_timer = PhaseTimer()
+
+    @app.after_request
+    def report_phase_timer(response):
+        timer = g.get('phase_timer')
+        if timer is None:
+            return response
+        if 'serialize' not in timer.phases:
+            timer.mark('serialize')
+        response.headers['Server-Timing'] = timer.header()
+        if log is not None:
+            log('request',
+                method=request.method,
+                path=request.path,
+                endpoint=request.endpoint,
+                status=response.status_code,
+                bytes=response.content_length,
+                phases_ms={phase: round(seconds * 1000, 3) for phase, seconds in timer.phases.items()},
+                total_ms=round(timer.total() * 1000, 3))
+        return response